@@ -2,11 +2,24 @@
 import time
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
-from streamlit_autorefresh import st_autorefresh
-
-from config import validate_config
-from services import gemini_service, notion_service, quiz_service
+from PIL import Image
+import io
+
+from config import PREFETCH_AHEAD, validate_config
+from services import (
+    deck_service,
+    fragment_log,
+    gemini_service,
+    notion_async_service,
+    notion_service,
+    prefetch_service,
+    quiz_service,
+    stats_service,
+    word_index,
+)
 
 # ──────────────────────────────────────────────
 # 페이지 설정
@@ -143,14 +156,6 @@ except EnvironmentError as e:
     st.error(str(e))
     st.stop()
 
-# ──────────────────────────────────────────────
-# Auto-refresh (퀴즈 진행 중에만 1초마다)
-# ──────────────────────────────────────────────
-if "quiz_state" in st.session_state:
-    qs_ref = st.session_state["quiz_state"]
-    if not qs_ref.get("completed", True):
-        st_autorefresh(interval=1000, key="quiz_refresh")
-
 # ──────────────────────────────────────────────
 # 헤더
 # ──────────────────────────────────────────────
@@ -175,9 +180,76 @@ if "quiz_state" in st.session_state:
     """, height=0)
 
 
+def rerun_fragment():
+    """
+    현재 프래그먼트만 다시 실행합니다.
+    프래그먼트가 전체 앱 실행 중에 그려진 경우에는 fragment 범위 rerun이 허용되지 않으므로 앱 전체를 다시 실행합니다.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
 # ========================================
 # 📸 단어 등록 탭
 # ========================================
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_preview_df(rows: tuple[tuple[str, str, str], ...]) -> pd.DataFrame:
+    """추출 단어 미리보기 표 (같은 내용이면 다시 만들지 않음)"""
+    df = pd.DataFrame(rows, columns=["Word", "Meaning", "등록된 페이지"])
+    df.index = range(1, len(df) + 1)
+    return df
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_preview_image(file_id: str, _image_source) -> bytes:
+    """업로드 이미지의 화면 표시용 축소본 (파일마다 한 번만 만듦)"""
+    image = Image.open(io.BytesIO(_image_source.getvalue()))
+    image.thumbnail((1280, 1280))
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+@st.fragment
+def render_extracted_words():
+    """추출 단어 미리보기와 저장 버튼. 체크박스 등 조작 시 이 프래그먼트만 다시 실행합니다."""
+    words = st.session_state["extracted_words"]
+
+    st.markdown("---")
+    st.markdown("### 📋 추출된 단어 목록")
+
+    annotated = word_index.annotate(words)
+    st.dataframe(
+        build_preview_df(tuple((w["word"], w["meaning"], w["known_in"]) for w in annotated)),
+        use_container_width=True,
+    )
+
+    known_count = sum(1 for w in annotated if w["known_in"])
+    skip_known = False
+    if known_count:
+        st.info(f"ℹ️ {known_count}개의 단어가 이미 다른 페이지에 등록되어 있습니다.")
+        skip_known = st.checkbox("이미 등록된 단어는 저장하지 않기", value=True)
+
+    st.markdown("---")
+
+    if st.button("💾 Notion에 저장하기", type="primary", use_container_width=True):
+        with st.spinner("📤 Notion에 저장하는 중..."):
+            try:
+                save_targets = word_index.split_known(words)[0] if skip_known else words
+                summary = gemini_service.generate_summary(save_targets or words)
+                page_title = notion_async_service.run(
+                    notion_async_service.save_words(words, summary, skip_known=skip_known)
+                )
+                st.success(f'✅ Notion에 저장 완료! 📄 페이지: **{page_title}**')
+                del st.session_state["extracted_words"]
+                # 미리보기 프래그먼트를 없애기 위해 전체 rerun
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Notion 저장 실패: {str(e)}")
+
+
 with tab_register:
     st.markdown("### 📸 이미지에서 단어 추출하기")
     st.caption("영어 단어가 포함된 이미지를 업로드하면 AI가 자동으로 단어와 뜻을 추출합니다.")
@@ -205,6 +277,16 @@ with tab_register:
                 st.session_state["camera_active"] = False
                 st.rerun()
 
+    with st.expander("⚙️ 단어 인덱스 관리"):
+        st.caption("이미 저장된 단어를 찾기 위한 로컬 인덱스를 Notion 페이지로부터 다시 만듭니다.")
+        if st.button("🔄 단어 인덱스 재구축", use_container_width=True):
+            with st.spinner("📥 Notion에서 모든 단어를 불러오는 중..."):
+                try:
+                    count = notion_service.rebuild_word_index()
+                    st.success(f"✅ {count}개의 단어를 색인했습니다.")
+                except Exception as e:
+                    st.error(f"❌ 인덱스 재구축 실패: {str(e)}")
+
     image_source = None
     if st.session_state.get("camera_active") and "camera" in st.session_state:
         camera_input = st.session_state.get("camera")
@@ -214,45 +296,38 @@ with tab_register:
         image_source = uploaded_file
 
     if image_source:
-        st.image(image_source, caption="업로드된 이미지", use_container_width=True)
+        st.image(
+            build_preview_image(image_source.file_id, image_source),
+            caption="업로드된 이미지",
+            use_container_width=True,
+        )
+
+        tiled = st.checkbox(
+            "🧩 고해상도 분할 추출",
+            help="단어가 많은 큰 이미지를 여러 영역으로 나눠 동시에 분석합니다. 작은 이미지는 한 번에 분석합니다.",
+        )
 
         if st.button("🔍 AI로 단어 추출하기", type="primary", use_container_width=True):
             with st.spinner("🤖 Gemini가 이미지를 분석하고 있습니다..."):
                 try:
                     image_bytes = image_source.getvalue()
-                    words = gemini_service.analyze_image(image_bytes)
+                    words, skipped_tiles = gemini_service.analyze_image(image_bytes, tiled=tiled)
 
                     if not words:
                         st.warning("⚠️ 이미지에서 영어 단어를 찾을 수 없습니다.")
                     else:
                         st.session_state["extracted_words"] = words
                         st.success(f"✅ {len(words)}개의 단어를 추출했습니다!")
+                    if skipped_tiles:
+                        st.warning(
+                            f"⚠️ 이미지 조각 {skipped_tiles}개를 분석하지 못해 일부 영역의 단어가 빠졌을 수 있습니다. "
+                            "결과를 확인하거나 분할 분석을 끄고 다시 시도해주세요."
+                        )
                 except Exception as e:
                     st.error(f"❌ 단어 추출 실패: {str(e)}")
 
     if "extracted_words" in st.session_state and st.session_state["extracted_words"]:
-        words = st.session_state["extracted_words"]
-
-        st.markdown("---")
-        st.markdown("### 📋 추출된 단어 목록")
-
-        df = pd.DataFrame(words)
-        df.columns = ["Word", "Meaning"]
-        df.index = range(1, len(df) + 1)
-        st.dataframe(df, use_container_width=True)
-
-        st.markdown("---")
-
-        if st.button("💾 Notion에 저장하기", type="primary", use_container_width=True):
-            with st.spinner("📤 Notion에 저장하는 중..."):
-                try:
-                    summary = gemini_service.generate_summary(words)
-                    page_title = notion_service.save_words(words, summary)
-                    st.success(f'✅ Notion에 저장 완료! 📄 페이지: **{page_title}**')
-                    del st.session_state["extracted_words"]
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Notion 저장 실패: {str(e)}")
+        render_extracted_words()
 
 
 # ========================================
@@ -260,6 +335,231 @@ with tab_register:
 # ========================================
 TIMER_SECONDS = 30
 
+
+@st.fragment(run_every=1.0)
+def render_quiz_question():
+    """퀴즈 문제 패널. 답 선택과 1초 타이머 tick은 이 프래그먼트만 다시 실행합니다."""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        fragment_log.record(ctx.session_id, "quiz_question")
+
+    qs = st.session_state.get("quiz_state")
+    if not qs or qs["completed"]:
+        return
+
+    current = qs["current"]
+    total = qs["total"]
+    q = qs["quiz"][current]
+
+    # 진행 상황
+    st.progress(current / total, text=f"문제 {current + 1} / {total}  |  점수: {qs['score']}/{current}")
+
+    if not qs["submitted"]:
+        # ── 활성 문제 상태 ──
+        elapsed = time.time() - qs["question_start_time"]
+        remaining = max(0, int(TIMER_SECONDS - elapsed))
+
+        # 타임아웃 체크
+        if remaining <= 0:
+            qs["answers"].append({
+                "question": q["question"],
+                "your_answer": "⏰ 시간 초과",
+                "correct_answer": q["answer"],
+                "is_correct": False,
+                "latency_ms": TIMER_SECONDS * 1000,
+            })
+            qs["submitted"] = True
+            qs["last_correct"] = False
+            qs["last_answer"] = q["answer"]
+            qs["last_timeout"] = True
+            qs["feedback_time"] = time.time()
+            rerun_fragment()
+
+        # 타이머 + 문제 표시
+        timer_col, question_col = st.columns([1, 5])
+
+        with timer_col:
+            css_class = "timer-warning" if remaining <= 10 else "timer-normal"
+            st.markdown(
+                f'<div class="{css_class}">⏰ {remaining}초</div>',
+                unsafe_allow_html=True,
+            )
+            st.progress(remaining / TIMER_SECONDS)
+
+        with question_col:
+            label = "Word" if qs["quiz_type"] == "A" else "뜻"
+            st.markdown(
+                f'<div class="word-card"><h2>{q["question"]}</h2>'
+                f'<p style="color:#6b7280;margin-top:0.5rem">위 {label}의 정답을 선택하세요</p></div>',
+                unsafe_allow_html=True,
+            )
+
+        # 선택지 (선택 시 자동 제출)
+        selected = st.radio(
+            "정답을 선택하세요:",
+            q["choices"],
+            index=None,
+            key=f"quiz_q_{current}",
+            label_visibility="collapsed",
+        )
+
+        # 선택하면 자동 제출
+        if selected is not None:
+            is_correct = selected == q["answer"]
+
+            if is_correct:
+                qs["score"] += 1
+
+            qs["answers"].append({
+                "question": q["question"],
+                "your_answer": selected,
+                "correct_answer": q["answer"],
+                "is_correct": is_correct,
+                "latency_ms": int((time.time() - qs["question_start_time"]) * 1000),
+            })
+            qs["submitted"] = True
+            qs["last_correct"] = is_correct
+            qs["last_answer"] = q["answer"]
+            qs["last_timeout"] = False
+            qs["feedback_time"] = time.time()
+            rerun_fragment()
+
+    else:
+        # ── 피드백 상태 ──
+        if qs["last_timeout"]:
+            st.markdown(
+                f'<div class="timeout-answer">⏰ 시간 초과! 정답은 <strong>{qs["last_answer"]}</strong>입니다.</div>',
+                unsafe_allow_html=True,
+            )
+        elif qs["last_correct"]:
+            st.markdown(
+                '<div class="correct-answer">🎉 정답입니다!</div>',
+                unsafe_allow_html=True,
+            )
+        else:
+            st.markdown(
+                f'<div class="wrong-answer">❌ 오답! 정답은 <strong>{qs["last_answer"]}</strong>입니다.</div>',
+                unsafe_allow_html=True,
+            )
+
+        # 1.5초 후 자동 다음 문제 (프래그먼트가 1초마다 rerun)
+        if time.time() - qs["feedback_time"] >= 1.5:
+            qs["submitted"] = False
+            qs["last_timeout"] = False
+            if current + 1 >= total:
+                # 결과 화면 프래그먼트로 전환하기 위해 전체 rerun
+                qs["completed"] = True
+                st.rerun()
+            else:
+                qs["current"] += 1
+                qs["question_start_time"] = time.time()
+                rerun_fragment()
+
+
+@st.fragment
+def render_quiz_results():
+    """퀴즈 결과 화면. Notion 반영 후 다시 그릴 때 이 프래그먼트만 다시 실행합니다."""
+    qs = st.session_state["quiz_state"]
+
+    score = qs["score"]
+    total = qs["total"]
+    pct = (score / total) * 100
+
+    results = []
+    for a in qs["answers"]:
+        if a["your_answer"] == "⏰ 시간 초과":
+            emoji = "⏰"
+        elif a["is_correct"]:
+            emoji = "✅"
+        else:
+            emoji = "❌"
+        results.append({
+            "word": a["question"] if qs["quiz_type"] == "A" else a["correct_answer"],
+            "result": emoji,
+            "latency_ms": a["latency_ms"],
+        })
+
+    # 로컬 학습 통계 기록 (최초 1회)
+    if not qs.get("stats_recorded"):
+        try:
+            stats_service.record(qs["page_id"], qs["quiz_type"], results)
+        except OSError as e:
+            st.warning(f"⚠️ 학습 통계 저장 실패: {str(e)}")
+        qs["stats_recorded"] = True
+
+    # Notion 결과 업데이트 (최초 1회)
+    if not qs.get("notion_updated"):
+        with st.spinner("📤 Notion에 퀴즈 결과를 저장하는 중..."):
+            try:
+                notion_async_service.run(
+                    notion_async_service.update_word_results(qs["page_id"], results)
+                )
+                qs["notion_updated"] = True
+                if "word_prefetcher" in st.session_state:
+                    st.session_state["word_prefetcher"].invalidate(qs["page_id"])
+                rerun_fragment()
+            except Exception as e:
+                st.warning(f"⚠️ Notion 결과 업데이트 실패: {str(e)}")
+                qs["notion_updated"] = True
+
+    st.markdown(
+        f"""
+        <div class="score-card">
+            <p style="font-size:1.2rem;margin-bottom:0.5rem">🏆 최종 점수</p>
+            <h1>{score} / {total}</h1>
+            <p style="font-size:1.5rem;margin-top:0.5rem">{pct:.0f}%</p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    if pct == 100:
+        st.balloons()
+        st.success("🎊 완벽합니다! 모든 문제를 맞혔어요!")
+    elif pct >= 70:
+        st.success("👏 훌륭해요! 조금만 더 연습하면 완벽해질 거예요!")
+    else:
+        st.info("💪 아직 갈 길이 멀지만 포기하지 마세요!")
+
+    # 틀린 단어 목록
+    wrong_answers = [a for a in qs["answers"] if not a["is_correct"]]
+    if wrong_answers:
+        st.markdown("---")
+        st.markdown("### 📌 틀린 단어 복습")
+        wrong_df = pd.DataFrame(wrong_answers)[["question", "your_answer", "correct_answer"]]
+        wrong_df.columns = ["문제", "내 답", "정답"]
+        wrong_df.index = range(1, len(wrong_df) + 1)
+        st.dataframe(wrong_df, use_container_width=True)
+
+    # 이번 퀴즈 단어들의 누적 학습 통계
+    page_stats = stats_service.word_stats(qs["page_id"])
+    stats_rows = [
+        {
+            "단어": r["word"],
+            "이번 응답(초)": round(r["latency_ms"] / 1000, 1),
+            "시도": page_stats[r["word"]]["attempts"],
+            "정답률": f'{page_stats[r["word"]]["accuracy"] * 100:.0f}%',
+            "응답 시간 중앙값(초)": round(page_stats[r["word"]]["median_latency_ms"] / 1000, 1),
+        }
+        for r in results
+        if r["word"] in page_stats
+    ]
+    if stats_rows:
+        with st.expander("📊 단어별 학습 통계"):
+            stats_df = pd.DataFrame(stats_rows)
+            stats_df.index = range(1, len(stats_df) + 1)
+            st.dataframe(stats_df, use_container_width=True)
+
+    # Notion 결과 반영 안내
+    if qs.get("notion_updated"):
+        st.success("📝 Notion에 정답/오답 결과가 반영되었습니다!")
+
+    # 다시 풀기 (퀴즈 설정 화면으로 돌아가기 위해 전체 rerun)
+    if st.button("🔄 다시 풀기", type="primary", use_container_width=True):
+        del st.session_state["quiz_state"]
+        st.rerun()
+
+
 with tab_quiz:
     st.markdown("### 📝 단어 퀴즈")
     st.caption("Notion에 저장된 단어로 퀴즈를 풀어보세요!")
@@ -267,19 +567,33 @@ with tab_quiz:
     # ── 페이지 로드 ──
     if st.button("🔄 페이지 목록 새로고침", use_container_width=True):
         st.session_state.pop("quiz_pages", None)
+        st.session_state.pop("word_prefetcher", None)
         st.session_state.pop("quiz_state", None)
         st.rerun()
 
-    if "quiz_pages" not in st.session_state:
-        with st.spinner("📥 Notion에서 페이지 목록을 불러오는 중..."):
-            try:
-                pages = notion_service.fetch_pages()
-                st.session_state["quiz_pages"] = pages
-            except Exception as e:
-                st.error(f"❌ 페이지 목록 로드 실패: {str(e)}")
-                st.stop()
+    # 오프라인 덱 파일이 있으면 Notion 대신 사용할 수 있음
+    try:
+        deck = deck_service.open_deck()
+    except ValueError as e:
+        st.warning(f"⚠️ 오프라인 덱을 열 수 없어 Notion을 사용합니다: {str(e)}")
+        deck = None
+    use_deck = deck is not None and st.toggle(
+        f"📦 오프라인 덱 사용 ({len(deck)}개 단어)", value=False
+    )
+
+    if use_deck:
+        pages = deck.pages()
+    else:
+        if "quiz_pages" not in st.session_state:
+            with st.spinner("📥 Notion에서 페이지 목록을 불러오는 중..."):
+                try:
+                    pages = notion_async_service.run(notion_async_service.fetch_pages())
+                    st.session_state["quiz_pages"] = pages
+                except Exception as e:
+                    st.error(f"❌ 페이지 목록 로드 실패: {str(e)}")
+                    st.stop()
 
-    pages = st.session_state.get("quiz_pages", [])
+        pages = st.session_state.get("quiz_pages", [])
 
     if not pages:
         st.info("📭 아직 저장된 단어가 없습니다. '단어 등록' 탭에서 먼저 단어를 등록해주세요!")
@@ -294,12 +608,22 @@ with tab_quiz:
                 options=list(page_options.keys()),
             )
 
+        # 선택한 페이지와 다음 페이지들의 단어를 백그라운드에서 미리 불러오기
+        if not use_deck:
+            if "word_prefetcher" not in st.session_state:
+                st.session_state["word_prefetcher"] = prefetch_service.WordPrefetcher()
+            page_ids = list(page_options.values())
+            selected_index = page_ids.index(page_options[selected_title])
+            st.session_state["word_prefetcher"].request(
+                page_ids[selected_index:selected_index + 1 + PREFETCH_AHEAD]
+            )
+
         with col_type:
             quiz_type = st.radio("퀴즈 유형", ["A: 영→한", "B: 한→영"], horizontal=True)
             quiz_type_key = "A" if "A" in quiz_type else "B"
 
         with col_filter:
-            quiz_filter = st.radio("출제 범위", ["전체", "오답만"], horizontal=True)
+            quiz_filter = st.radio("출제 범위", ["전체", "오답만", "취약 단어"], horizontal=True)
 
         # ── 퀴즈 시작 ──
         if st.button("🚀 퀴즈 시작!", type="primary", use_container_width=True):
@@ -307,12 +631,25 @@ with tab_quiz:
 
             with st.spinner("📥 단어를 불러오는 중..."):
                 try:
-                    all_words = notion_service.fetch_words(selected_page_id)
+                    if use_deck:
+                        all_words = deck.words(selected_page_id)
+                    else:
+                        all_words = st.session_state["word_prefetcher"].get(selected_page_id)
 
                     if quiz_filter == "오답만":
-                        quiz_words = [w for w in all_words if w.get("result") in ["❌", "⏰", ""]]
+                        # 오답 보기용 전체 단어를 이미 불러왔으므로 추가 Notion 조회 없이 걸러냄
+                        if use_deck:
+                            quiz_words = deck.wrong_words(selected_page_id)
+                        else:
+                            quiz_words = [w for w in all_words if w.get("result") in ["❌", "⏰", ""]]
                         if not quiz_words:
                             quiz_words = [w for w in all_words if w.get("result") != "✅"]
+                    elif quiz_filter == "취약 단어":
+                        # 로컬 학습 통계 기준: 정답률이 낮고 응답이 느린 단어
+                        quiz_words = stats_service.weak_words(selected_page_id, all_words)
+                        if not quiz_words:
+                            st.info("ℹ️ 아직 학습 기록이 부족해 전체 단어로 출제합니다.")
+                            quiz_words = all_words
                     else:
                         quiz_words = all_words
 
@@ -343,175 +680,7 @@ with tab_quiz:
 
         # ── 퀴즈 진행 ──
         if "quiz_state" in st.session_state:
-            qs = st.session_state["quiz_state"]
-
-            if not qs["completed"]:
-                current = qs["current"]
-                total = qs["total"]
-                q = qs["quiz"][current]
-
-                # 진행 상황
-                st.progress(current / total, text=f"문제 {current + 1} / {total}  |  점수: {qs['score']}/{current}")
-
-                if not qs["submitted"]:
-                    # ── 활성 문제 상태 ──
-                    elapsed = time.time() - qs["question_start_time"]
-                    remaining = max(0, int(TIMER_SECONDS - elapsed))
-
-                    # 타임아웃 체크
-                    if remaining <= 0:
-                        qs["answers"].append({
-                            "question": q["question"],
-                            "your_answer": "⏰ 시간 초과",
-                            "correct_answer": q["answer"],
-                            "is_correct": False,
-                        })
-                        qs["submitted"] = True
-                        qs["last_correct"] = False
-                        qs["last_answer"] = q["answer"]
-                        qs["last_timeout"] = True
-                        qs["feedback_time"] = time.time()
-                        st.rerun()
-
-                    # 타이머 + 문제 표시
-                    timer_col, question_col = st.columns([1, 5])
-
-                    with timer_col:
-                        css_class = "timer-warning" if remaining <= 10 else "timer-normal"
-                        st.markdown(
-                            f'<div class="{css_class}">⏰ {remaining}초</div>',
-                            unsafe_allow_html=True,
-                        )
-                        st.progress(remaining / TIMER_SECONDS)
-
-                    with question_col:
-                        label = "Word" if qs["quiz_type"] == "A" else "뜻"
-                        st.markdown(
-                            f'<div class="word-card"><h2>{q["question"]}</h2>'
-                            f'<p style="color:#6b7280;margin-top:0.5rem">위 {label}의 정답을 선택하세요</p></div>',
-                            unsafe_allow_html=True,
-                        )
-
-                    # 선택지 (선택 시 자동 제출)
-                    selected = st.radio(
-                        "정답을 선택하세요:",
-                        q["choices"],
-                        index=None,
-                        key=f"quiz_q_{current}",
-                        label_visibility="collapsed",
-                    )
-
-                    # 선택하면 자동 제출
-                    if selected is not None:
-                        is_correct = selected == q["answer"]
-
-                        if is_correct:
-                            qs["score"] += 1
-
-                        qs["answers"].append({
-                            "question": q["question"],
-                            "your_answer": selected,
-                            "correct_answer": q["answer"],
-                            "is_correct": is_correct,
-                        })
-                        qs["submitted"] = True
-                        qs["last_correct"] = is_correct
-                        qs["last_answer"] = q["answer"]
-                        qs["last_timeout"] = False
-                        qs["feedback_time"] = time.time()
-                        st.rerun()
-
-                else:
-                    # ── 피드백 상태 ──
-                    if qs["last_timeout"]:
-                        st.markdown(
-                            f'<div class="timeout-answer">⏰ 시간 초과! 정답은 <strong>{qs["last_answer"]}</strong>입니다.</div>',
-                            unsafe_allow_html=True,
-                        )
-                    elif qs["last_correct"]:
-                        st.markdown(
-                            '<div class="correct-answer">🎉 정답입니다!</div>',
-                            unsafe_allow_html=True,
-                        )
-                    else:
-                        st.markdown(
-                            f'<div class="wrong-answer">❌ 오답! 정답은 <strong>{qs["last_answer"]}</strong>입니다.</div>',
-                            unsafe_allow_html=True,
-                        )
-
-                    # 1초 후 자동 다음 문제 (autorefresh가 1초마다 rerun)
-                    if time.time() - qs["feedback_time"] >= 1.5:
-                        qs["submitted"] = False
-                        qs["last_timeout"] = False
-                        if current + 1 >= total:
-                            qs["completed"] = True
-                        else:
-                            qs["current"] += 1
-                            qs["question_start_time"] = time.time()
-                        st.rerun()
-
+            if not st.session_state["quiz_state"]["completed"]:
+                render_quiz_question()
             else:
-                # ── 결과 화면 ──
-                score = qs["score"]
-                total = qs["total"]
-                pct = (score / total) * 100
-
-                # Notion 결과 업데이트 (최초 1회)
-                if not qs.get("notion_updated"):
-                    with st.spinner("📤 Notion에 퀴즈 결과를 저장하는 중..."):
-                        try:
-                            results = []
-                            for a in qs["answers"]:
-                                if a["your_answer"] == "⏰ 시간 초과":
-                                    emoji = "⏰"
-                                elif a["is_correct"]:
-                                    emoji = "✅"
-                                else:
-                                    emoji = "❌"
-                                results.append({"word": a["question"] if qs["quiz_type"] == "A" else a["correct_answer"], "result": emoji})
-
-                            notion_service.update_word_results(qs["page_id"], results)
-                            qs["notion_updated"] = True
-                            st.rerun()
-                        except Exception as e:
-                            st.warning(f"⚠️ Notion 결과 업데이트 실패: {str(e)}")
-                            qs["notion_updated"] = True
-
-                st.markdown(
-                    f"""
-                    <div class="score-card">
-                        <p style="font-size:1.2rem;margin-bottom:0.5rem">🏆 최종 점수</p>
-                        <h1>{score} / {total}</h1>
-                        <p style="font-size:1.5rem;margin-top:0.5rem">{pct:.0f}%</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
-
-                if pct == 100:
-                    st.balloons()
-                    st.success("🎊 완벽합니다! 모든 문제를 맞혔어요!")
-                elif pct >= 70:
-                    st.success("👏 훌륭해요! 조금만 더 연습하면 완벽해질 거예요!")
-                else:
-                    st.info("💪 아직 갈 길이 멀지만 포기하지 마세요!")
-
-                # 틀린 단어 목록
-                wrong_answers = [a for a in qs["answers"] if not a["is_correct"]]
-                if wrong_answers:
-                    st.markdown("---")
-                    st.markdown("### 📌 틀린 단어 복습")
-                    wrong_df = pd.DataFrame(wrong_answers)
-                    wrong_df.columns = ["문제", "내 답", "정답", "정오"]
-                    wrong_df = wrong_df[["문제", "내 답", "정답"]]
-                    wrong_df.index = range(1, len(wrong_df) + 1)
-                    st.dataframe(wrong_df, use_container_width=True)
-
-                # Notion 결과 반영 안내
-                if qs.get("notion_updated"):
-                    st.success("📝 Notion에 정답/오답 결과가 반영되었습니다!")
-
-                # 다시 풀기
-                if st.button("🔄 다시 풀기", type="primary", use_container_width=True):
-                    del st.session_state["quiz_state"]
-                    st.rerun()
+                render_quiz_results()
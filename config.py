@@ -6,8 +6,27 @@ load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+GEMINI_FALLBACK_MODELS = [m.strip() for m in os.getenv("GEMINI_FALLBACK_MODELS", "").split(",") if m.strip()]
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_HEDGE_AFTER_SECONDS = float(os.getenv("GEMINI_HEDGE_AFTER_SECONDS", "0"))
+GEMINI_SLO_SECONDS = float(os.getenv("GEMINI_SLO_SECONDS", "30"))
+GEMINI_TILE_SIZE = int(os.getenv("GEMINI_TILE_SIZE", "1024"))
+GEMINI_TILE_OVERLAP = float(os.getenv("GEMINI_TILE_OVERLAP", "0.15"))
+GEMINI_TILE_MIN_PIXELS = int(os.getenv("GEMINI_TILE_MIN_PIXELS", str(2048 * 2048)))
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+NOTION_STORAGE = os.getenv("NOTION_STORAGE", "table")
+NOTION_WORDS_DATABASE_ID = os.getenv("NOTION_WORDS_DATABASE_ID")
+WORD_INDEX_PATH = os.getenv("WORD_INDEX_PATH", ".word_index.json")
+DECK_PATH = os.getenv("DECK_PATH", "deck.vdk")
+NOTION_MAX_CONCURRENCY = int(os.getenv("NOTION_MAX_CONCURRENCY", "3"))
+NOTION_TIMEOUT_SECONDS = float(os.getenv("NOTION_TIMEOUT_SECONDS", "60"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+PREFETCH_AHEAD = int(os.getenv("PREFETCH_AHEAD", "2"))
+PREFETCH_QUEUE_SIZE = int(os.getenv("PREFETCH_QUEUE_SIZE", "16"))
+PREFETCH_TTL_SECONDS = float(os.getenv("PREFETCH_TTL_SECONDS", "60"))
+STATS_PATH = os.getenv("STATS_PATH", ".quiz_stats.jsonl")
 
 
 def validate_config():
@@ -19,6 +38,8 @@ def validate_config():
         missing.append("NOTION_TOKEN")
     if not NOTION_DATABASE_ID:
         missing.append("NOTION_DATABASE_ID")
+    if NOTION_STORAGE == "database" and not NOTION_WORDS_DATABASE_ID:
+        missing.append("NOTION_WORDS_DATABASE_ID")
 
     if missing:
         raise EnvironmentError(
@@ -0,0 +1,527 @@
+"""동시 접속 부하 테스트 도구
+
+app.py를 실제 Streamlit 서버 프로세스 하나로 띄우고(`streamlit run`과 같은 부트스트랩),
+웹소켓 클라이언트 N개가 브라우저처럼 접속해 각자 퀴즈 하나를 끝까지 풀게 합니다.
+모든 세션이 한 서버 프로세스 안에서 실행되므로 GIL, 공유 미리 불러오기 풀, Gemini/Notion 동시성 제한,
+single-flight 등 세션 간에 공유되는 자원의 경합이 그대로 반영됩니다.
+Notion/Gemini 호출은 서버 시작 시 지연 시간을 흉내 내는 스텁으로 바꿔 둡니다.
+
+클라이언트는 브라우저 프런트엔드와 같은 메시지를 보냅니다.
+- 버튼/선택 상자/라디오 조작은 위젯 상태를 담은 rerun 요청 (퀴즈 답 선택은 프래그먼트 범위 rerun)
+- 서버가 알려 준 `run_every` 주기마다 타이머 프래그먼트 rerun 요청 (답하기 전까지)
+
+측정 항목:
+- rerun 지연 시간 백분위: 클라이언트가 요청을 보낸 뒤 서버가 실행 완료를 알릴 때까지 (웹소켓 왕복 포함)
+- 프래그먼트 tick 지연: 클라이언트가 타이머 tick을 보낸 시각부터 앱이 기록한 프래그먼트 실행 시작 시각까지
+  (`services/fragment_log.py`, 서버 안의 대기열·GIL 경합으로 늦어진 만큼이며 클라이언트의 sleep 지터는 포함하지 않음)
+- 서버 CPU 시간, RSS 증가량: 워밍업 세션 뒤부터 측정한 서버 프로세스 값 (Linux의 /proc 기준, 그 외 플랫폼은 생략)
+
+사용법:
+    python load_test.py --sessions 20 --think-time 2
+    python load_test.py --sessions 50 --json result.json --max-p95-ms 300
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from unittest import mock
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+START_BUTTON = "🚀 퀴즈 시작!"
+PAGE_SELECTBOX = "📄 학습할 페이지 선택"
+ANSWER_RADIO = "정답을 선택하세요:"
+NOTION_UPDATED = "📝 Notion에 정답/오답 결과가 반영되었습니다!"
+TIMER_FRAGMENT = "quiz_question"  # app.py가 fragment_log에 남기는 타이머 프래그먼트 이름
+SERVER_START_TIMEOUT = 30.0
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pick(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1)
+
+    return {"n": len(ordered), "p50": pick(50), "p90": pick(90), "p95": pick(95), "p99": pick(99), "max": round(ordered[-1], 1)}
+
+
+def _process_usage(pid: int) -> tuple[float, float] | None:
+    """프로세스의 누적 CPU 시간(초)과 현재 RSS(MB). /proc이 없는 플랫폼에서는 None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # 두 번째 필드(실행 파일 이름)에 공백이 있을 수 있으므로 ')' 뒤부터 나눔
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu, rss_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _prepare_env(tmp_dir: str) -> None:
+    """config 모듈이 로드되기 전에 더미 키와 임시 로컬 파일 경로를 설정합니다 (서버 프로세스가 물려받음)."""
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+    os.environ.setdefault("NOTION_TOKEN", "load-test")
+    os.environ.setdefault("NOTION_DATABASE_ID", "load-test")
+    os.environ["NOTION_STORAGE"] = "table"
+    os.environ["WORD_INDEX_PATH"] = os.path.join(tmp_dir, "word_index.json")
+    os.environ["STATS_PATH"] = os.path.join(tmp_dir, "quiz_stats.jsonl")
+    os.environ["DECK_PATH"] = os.path.join(tmp_dir, "deck.vdk")
+
+
+# ──────────────────────────────────────────────
+# 서버 프로세스
+# ──────────────────────────────────────────────
+def _install_stubs(stack: contextlib.ExitStack, opts) -> None:
+    """Notion/Gemini 호출을 스텁으로 바꿉니다."""
+    from services import gemini_service, notion_async_service
+
+    pages = [
+        {"id": f"page-{p}", "title": f"2026-01-01-{p + 1:02d}-부하 테스트", "summary": "부하 테스트", "last_edited": ""}
+        for p in range(opts.pages)
+    ]
+
+    async def fetch_pages():
+        await asyncio.sleep(opts.notion_latency)
+        return [dict(p) for p in pages]
+
+    async def fetch_words(page_id, only_wrong=False):
+        await asyncio.sleep(opts.notion_latency)
+        return [{"word": f"word{i}", "meaning": f"뜻{i}", "result": "-"} for i in range(opts.words)]
+
+    async def save_words(words, summary, skip_known=False):
+        await asyncio.sleep(opts.notion_latency)
+        return f"2026-01-01-99-{summary}"
+
+    async def update_word_results(page_id, results):
+        await asyncio.sleep(opts.notion_latency)
+
+    def analyze_image(image_bytes, tiled=False):
+        time.sleep(opts.gemini_latency)
+        return [{"word": f"word{i}", "meaning": f"뜻{i}"} for i in range(opts.words)], 0
+
+    def generate_summary(words):
+        time.sleep(opts.gemini_latency)
+        return "부하 테스트"
+
+    for module, name, stub in [
+        (notion_async_service, "fetch_pages", fetch_pages),
+        (notion_async_service, "fetch_words", fetch_words),
+        (notion_async_service, "save_words", save_words),
+        (notion_async_service, "update_word_results", update_word_results),
+        (gemini_service, "analyze_image", analyze_image),
+        (gemini_service, "generate_summary", generate_summary),
+    ]:
+        stack.enter_context(mock.patch.object(module, name, stub))
+
+
+def serve(opts) -> None:
+    """
+    스텁을 설치한 뒤 `streamlit run`과 같은 방식으로 app.py 서버를 실행합니다.
+    SIGTERM/SIGINT로 서버가 멈추면 앱이 남긴 프래그먼트 실행 기록을 `opts.serve_log`에 저장합니다.
+    """
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    from streamlit.web import bootstrap
+
+    from services import fragment_log
+
+    flag_options = {
+        "server_address": "127.0.0.1",
+        "server_port": opts.serve_port,
+        "server_headless": True,
+        "server_fileWatcherType": "none",
+        "browser_gatherUsageStats": False,
+        "global_developmentMode": False,
+    }
+    bootstrap.load_config_options(flag_options=flag_options)
+    with contextlib.ExitStack() as stack:
+        _install_stubs(stack, opts)
+        bootstrap.run(APP_PATH, False, [], flag_options)
+
+    with open(opts.serve_log, "w", encoding="utf-8") as f:
+        json.dump(fragment_log.get_runs(), f)
+
+
+def _start_server(opts, port: int, log_path: str, output) -> subprocess.Popen:
+    """스텁을 설치한 앱 서버 프로세스를 띄우고 응답할 때까지 기다립니다. 서버 출력은 output 파일로 보냅니다."""
+    args = [sys.executable, os.path.abspath(__file__), "--serve-port", str(port), "--serve-log", log_path]
+    for name in ("pages", "words", "notion_latency", "gemini_latency"):
+        args += [f"--{name.replace('_', '-')}", str(getattr(opts, name))]
+    server = subprocess.Popen(args, stdout=output, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            output.seek(0)
+            raise RuntimeError(f"서버가 시작되지 않았습니다: {output.read().decode(errors='replace')[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("서버가 제한시간 안에 응답하지 않았습니다.")
+
+
+def _stop_server(server: subprocess.Popen, log_path: str) -> list[dict]:
+    """서버를 멈추고 앱이 남긴 프래그먼트 실행 기록을 읽습니다."""
+    server.send_signal(signal.SIGTERM if hasattr(signal, "SIGTERM") else signal.SIGINT)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+    try:
+        with open(log_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+# ──────────────────────────────────────────────
+# 웹소켓 클라이언트
+# ──────────────────────────────────────────────
+class BrowserSession:
+    """Streamlit 프런트엔드를 흉내 내는 웹소켓 클라이언트 (요청은 한 번에 하나씩 보냄)"""
+
+    _FINAL_STATUSES = ("FINISHED_SUCCESSFULLY", "FINISHED_FRAGMENT_RUN_SUCCESSFULLY", "FINISHED_WITH_COMPILE_ERROR")
+
+    def __init__(self, port: int, script_timeout: float):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.script_timeout = script_timeout
+        self.conn = None
+        self.session_id = ""
+        self.tick_fragment_id = ""
+        self.tick_interval = 0.0
+        # delta 경로 → (script_run_id, fragment_id, Element)
+        self._elements: dict[tuple, tuple] = {}
+        self._cache: dict = {}
+        self._run_id = ""
+        self._run_fragments: list[str] = []
+
+    async def connect(self) -> None:
+        from tornado.websocket import websocket_connect
+
+        self.conn = await websocket_connect(self.url, max_message_size=64 * 2**20)
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+    async def rerun(self, widget_states: list[dict] | None = None, fragment_id: str = "", auto: bool = False) -> float:
+        """rerun 요청을 보내고 실행이 끝날 때까지 기다립니다. 보낸 시각(time.time)을 반환합니다."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.query_string = ""
+        client_state.page_script_hash = ""
+        client_state.fragment_id = fragment_id
+        client_state.is_auto_rerun = auto
+        for state in widget_states or []:
+            widget = client_state.widget_states.widgets.add()
+            for field, value in state.items():
+                setattr(widget, field, value)
+
+        sent_at = time.time()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._read_until_finished(), timeout=self.script_timeout)
+        return sent_at
+
+    async def _read_until_finished(self) -> None:
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            raw = await self.conn.read_message()
+            if raw is None:
+                raise ConnectionError("서버가 웹소켓 연결을 닫았습니다.")
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            # 같은 메시지를 이미 보냈으면 서버는 해시만 보냄
+            if msg.WhichOneof("type") == "ref_hash":
+                msg = self._cache[msg.ref_hash]
+            elif msg.metadata.cacheable:
+                self._cache[msg.hash] = msg
+            if self._handle(msg):
+                return
+
+    def _handle(self, msg) -> bool:
+        """ForwardMsg 하나를 반영합니다. 요청한 실행이 끝났으면 True"""
+        kind = msg.WhichOneof("type")
+        if kind == "new_session":
+            self.session_id = msg.new_session.initialize.session_id
+            self._run_id = msg.new_session.script_run_id
+            self._run_fragments = list(msg.new_session.fragment_ids_this_run)
+            if not self._run_fragments:
+                # 전체 실행이면 이전 실행의 자동 rerun 주기는 해제됨
+                self.tick_fragment_id = ""
+        elif kind == "auto_rerun":
+            self.tick_fragment_id = msg.auto_rerun.fragment_id
+            self.tick_interval = msg.auto_rerun.interval
+        elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            element = msg.delta.new_element
+            if element.WhichOneof("type") == "exception":
+                raise RuntimeError(f"앱 예외: {element.exception.type}: {element.exception.message}")
+            self._elements[tuple(msg.metadata.delta_path)] = (self._run_id, msg.delta.fragment_id, element)
+        elif kind == "script_finished":
+            status = type(msg).ScriptFinishedStatus.Name(msg.script_finished)
+            if status in self._FINAL_STATUSES:
+                self._drop_stale_elements()
+                return True
+        return False
+
+    def _drop_stale_elements(self) -> None:
+        """이번 실행에서 다시 그려지지 않은 요소를 지웁니다 (프래그먼트 실행이면 그 프래그먼트 안만)."""
+        self._elements = {
+            path: entry for path, entry in self._elements.items()
+            if entry[0] == self._run_id or (self._run_fragments and entry[1] not in self._run_fragments)
+        }
+
+    def find(self, kind: str, label: str = "", contains: str = ""):
+        """현재 화면에서 조건에 맞는 요소를 찾습니다. (fragment_id, 요소) 또는 None"""
+        for _, fragment_id, element in self._elements.values():
+            if element.WhichOneof("type") != kind:
+                continue
+            widget = getattr(element, kind)
+            if label and widget.label != label:
+                continue
+            if contains and contains not in widget.body:
+                continue
+            return fragment_id, widget
+        return None
+
+
+class SessionMetrics:
+    """세션 하나의 측정값"""
+
+    def __init__(self):
+        self.rerun_ms: list[float] = []
+        # 타이머 tick을 보낸 시각 (앱 기록과 맞춰 tick 지연 계산)
+        self.tick_sent: list[float] = []
+        self.session_id = ""
+        self.questions = 0
+        self.timeouts = 0
+        self.completed = False
+        self.error = ""
+
+    async def timed_rerun(self, session: BrowserSession, **kwargs) -> float:
+        started = time.perf_counter()
+        sent_at = await session.rerun(**kwargs)
+        self.rerun_ms.append((time.perf_counter() - started) * 1000)
+        return sent_at
+
+
+async def run_session(index: int, opts, port: int, start_delay: float, sessions: list) -> SessionMetrics:
+    """세션 하나가 접속해 퀴즈를 시작하고 끝까지 풉니다. 연결은 측정이 끝날 때까지 유지합니다."""
+    metrics = SessionMetrics()
+    rng = random.Random(index)
+    session = BrowserSession(port, opts.script_timeout)
+    sessions.append(session)
+
+    await asyncio.sleep(start_delay)
+    try:
+        await session.connect()
+        await metrics.timed_rerun(session)
+        metrics.session_id = session.session_id
+
+        # 페이지를 골라 퀴즈 시작 (세션마다 다른 페이지를 골라 미리 불러오기 풀도 함께 사용)
+        start = session.find("button", label=START_BUTTON)
+        page_box = session.find("selectbox", label=PAGE_SELECTBOX)
+        if start is None or page_box is None:
+            raise RuntimeError("퀴즈 설정 화면이 표시되지 않았습니다.")
+        start, page_box = start[1], page_box[1]
+        await metrics.timed_rerun(session, widget_states=[
+            {"id": page_box.id, "int_value": rng.randrange(len(page_box.options))},
+            {"id": start.id, "trigger_value": True},
+        ])
+
+        current_radio = ""
+        answer_at: float | None = None
+        next_tick = time.perf_counter() + session.tick_interval
+        while session.find("alert", contains=NOTION_UPDATED) is None:
+            found = session.find("radio", label=ANSWER_RADIO)
+            if found is not None and found[1].id != current_radio:
+                # 새 문제: 답할 시각을 정함 (None이면 시간 초과까지 대기)
+                metrics.questions += 1
+                current_radio = found[1].id
+                answer_at = None if rng.random() < opts.timeout_ratio else time.perf_counter() + opts.think_time
+                if answer_at is None:
+                    metrics.timeouts += 1
+
+            if found is not None and answer_at is not None and time.perf_counter() >= answer_at:
+                fragment_id, radio = found
+                _, card = session.find("markdown", contains='class="word-card"')
+                # 스텁 단어는 wordN ↔ 뜻N
+                question = re.search(r"<h2>(.*?)</h2>", card.body).group(1)
+                answer = f"뜻{question[len('word'):]}"
+                wrong = [c for c in radio.options if c != answer]
+                choice = answer if rng.random() < opts.accuracy or not wrong else rng.choice(wrong)
+                answer_at = None
+                await metrics.timed_rerun(
+                    session,
+                    widget_states=[{"id": radio.id, "int_value": list(radio.options).index(choice)}],
+                    fragment_id=fragment_id,
+                )
+                continue
+
+            if not session.tick_fragment_id:
+                raise RuntimeError("퀴즈 화면도 결과 화면도 아닌 상태에서 멈췄습니다.")
+
+            # 브라우저처럼 run_every 주기마다 타이머 프래그먼트 rerun
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+            next_tick = max(next_tick + session.tick_interval, time.perf_counter())
+            sent_at = await metrics.timed_rerun(session, fragment_id=session.tick_fragment_id, auto=True)
+            metrics.tick_sent.append(sent_at)
+
+        metrics.completed = True
+    except Exception as e:
+        metrics.error = f"{type(e).__name__}: {e}"
+    return metrics
+
+
+def _tick_lags_ms(metrics: SessionMetrics, runs: list[dict]) -> list[float]:
+    """각 tick을 보낸 시각 이후 앱이 처음 기록한 타이머 프래그먼트 실행까지 걸린 시간"""
+    starts = sorted(r["time"] for r in runs if r["session_id"] == metrics.session_id and r["name"] == TIMER_FRAGMENT)
+    lags = []
+    i = 0
+    for sent_at in metrics.tick_sent:
+        while i < len(starts) and starts[i] < sent_at:
+            i += 1
+        if i < len(starts):
+            lags.append((starts[i] - sent_at) * 1000)
+    return lags
+
+
+async def _drive(opts, port: int, server_pid: int) -> tuple[list[SessionMetrics], dict]:
+    # 워밍업: 앱 모듈 import와 첫 실행 비용을 서버 측정값에서 뺌
+    warmup = BrowserSession(port, opts.script_timeout)
+    await warmup.connect()
+    await warmup.rerun()
+    warmup.close()
+
+    usage_start = _process_usage(server_pid)
+    sessions: list[BrowserSession] = []
+    results = await asyncio.gather(*[
+        run_session(i, opts, port, opts.ramp_up * i / max(1, opts.sessions), sessions)
+        for i in range(opts.sessions)
+    ])
+    # 모든 세션이 접속해 있는 상태에서 서버 사용량 측정
+    usage_end = _process_usage(server_pid)
+    for session in sessions:
+        session.close()
+
+    usage = {}
+    if usage_start is not None and usage_end is not None:
+        usage = {"cpu_seconds": usage_end[0] - usage_start[0], "rss_growth_mb": usage_end[1] - usage_start[1]}
+    return results, usage
+
+
+def run_load_test(opts, tmp_dir: str) -> dict:
+    """서버 하나를 띄워 세션들을 동시에 실행하고 집계 결과를 반환합니다."""
+    port = _free_port()
+    log_path = os.path.join(tmp_dir, "fragment_runs.json")
+    with open(os.path.join(tmp_dir, "server.log"), "w+b") as output:
+        server = _start_server(opts, port, log_path, output)
+        wall_start = time.perf_counter()
+        try:
+            results, usage = asyncio.run(_drive(opts, port, server.pid))
+        finally:
+            wall = time.perf_counter() - wall_start
+            runs = _stop_server(server, log_path)
+
+    rerun_ms = [v for r in results for v in r.rerun_ms]
+    cpu_seconds = usage.get("cpu_seconds")
+    rss_growth = usage.get("rss_growth_mb")
+    return {
+        "sessions": opts.sessions,
+        "completed": sum(r.completed for r in results),
+        "errors": [r.error for r in results if r.error],
+        "questions": sum(r.questions for r in results),
+        "timeouts": sum(r.timeouts for r in results),
+        "wall_seconds": round(wall, 2),
+        "rerun_latency_ms": _percentiles(rerun_ms),
+        "tick_lag_ms": _percentiles([v for r in results for v in _tick_lags_ms(r, runs)]),
+        "server_cpu_seconds": round(cpu_seconds, 2) if cpu_seconds is not None else None,
+        "server_cpu_ms_per_rerun": round(cpu_seconds * 1000 / len(rerun_ms), 2) if cpu_seconds is not None and rerun_ms else None,
+        "server_rss_growth_mb": round(rss_growth, 1) if rss_growth is not None else None,
+        "server_rss_mb_per_session": round(rss_growth / opts.sessions, 2) if rss_growth is not None and opts.sessions else None,
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"세션: {report['sessions']}  완료: {report['completed']}  오류: {len(report['errors'])}  "
+          f"문제 수: {report['questions']} (시간 초과 {report['timeouts']})  소요: {report['wall_seconds']}s")
+    for key, label in [
+        ("rerun_latency_ms", "rerun 지연(ms)"),
+        ("tick_lag_ms", "tick 지연(ms)"),
+    ]:
+        stats = report[key]
+        detail = "  ".join(f"{k}={v}" for k, v in stats.items())
+        print(f"{label:<16} {detail}")
+    print(f"서버 CPU: {report['server_cpu_seconds']}s (rerun당 {report['server_cpu_ms_per_rerun']}ms)  "
+          f"서버 RSS 증가: {report['server_rss_growth_mb']}MB (세션당 {report['server_rss_mb_per_session']}MB)")
+    for error in report["errors"][:5]:
+        print(f"  ❌ {error}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="English Vocab Master 동시 접속 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=10, help="동시 세션 수")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="모든 세션을 시작하는 데 걸리는 시간(초)")
+    parser.add_argument("--pages", type=int, default=5, help="스텁 Notion 페이지 수")
+    parser.add_argument("--words", type=int, default=10, help="페이지당 단어 수 (= 문제 수)")
+    parser.add_argument("--think-time", type=float, default=2.0, help="문제당 답을 고르기까지 걸리는 시간(초)")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="정답을 고를 확률")
+    parser.add_argument("--timeout-ratio", type=float, default=0.0, help="답하지 않고 시간 초과시킬 문제 비율")
+    parser.add_argument("--notion-latency", type=float, default=0.2, help="스텁 Notion 요청 지연(초)")
+    parser.add_argument("--gemini-latency", type=float, default=2.0, help="스텁 Gemini 요청 지연(초)")
+    parser.add_argument("--script-timeout", type=float, default=30.0, help="요청 1회가 끝나기를 기다리는 제한시간(초)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--max-p95-ms", type=float, help="rerun 지연 p95가 이 값을 넘으면 실패(종료 코드 1)")
+    # 내부용: 스텁을 설치한 앱 서버로 실행
+    parser.add_argument("--serve-port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--serve-log", help=argparse.SUPPRESS)
+    opts = parser.parse_args(argv)
+
+    if opts.serve_port:
+        serve(opts)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 서버 프로세스는 환경 변수를 물려받음
+        _prepare_env(tmp_dir)
+        report = run_load_test(opts, tmp_dir)
+
+    _print_report(report)
+    if opts.json:
+        with open(opts.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if report["errors"]:
+        return 1
+    if opts.max_p95_ms is not None and report["rerun_latency_ms"].get("p95", 0) > opts.max_p95_ms:
+        print(f"❌ rerun 지연 p95가 기준({opts.max_p95_ms}ms)을 넘었습니다.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
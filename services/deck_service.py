@@ -0,0 +1,317 @@
+"""오프라인 단어 덱 스냅샷 서비스
+
+Notion의 모든 페이지와 단어(결과 포함)를 하나의 바이너리 덱 파일로 내보내고,
+퀴즈에서는 `mmap`으로 파일을 열어 필요한 페이지의 레코드만 디코딩합니다.
+
+파일 구조 (little-endian):
+    [헤더] [페이지 레코드 × N] [단어 레코드 × M] [문자열 테이블]
+
+- 헤더에는 내보낸 시각이 기록되어 `refresh`가 그 이후(같은 분 포함)에 수정된 페이지를 다시 가져옵니다.
+
+- 페이지/단어 레코드는 고정 폭이며, 문자열은 (오프셋, 길이)로 문자열 테이블을 가리킵니다.
+- 한 페이지의 단어는 연속으로 저장되어 (first_word, word_count)로 바로 찾을 수 있습니다.
+- 결과(✅/❌/⏰)는 1바이트 코드로 저장되어 오답 필터가 문자열 디코딩 없이 동작합니다.
+
+사용법:
+    python -m services.deck_service export [경로]    # 전체 내보내기
+    python -m services.deck_service refresh [경로]   # 변경된 페이지만 다시 가져오기
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+
+from config import DECK_PATH, NOTION_STORAGE
+from services import notion_service
+
+MAGIC = b"VDK1"
+VERSION = 2
+
+# magic, version, flags, page_count, word_count, pages_offset, words_offset, strings_offset, strings_size, exported_at
+_HEADER = struct.Struct("<4sHHIIIIIId")
+# id, title, summary, last_edited (각각 offset/len), first_word, word_count
+_PAGE = struct.Struct("<IIIIIIIIII")
+# word offset/len, meaning offset/len, result code
+_WORD = struct.Struct("<IIIIB3x")
+
+RESULT_CODES = ("", "-", "✅", "❌", "⏰")
+_RESULT_TO_CODE = {r: i for i, r in enumerate(RESULT_CODES)}
+_WRONG_CODES = frozenset(_RESULT_TO_CODE[r] for r in ("❌", "⏰", ""))
+
+_readers: dict[str, tuple[float, "DeckReader"]] = {}
+
+
+class _StringTable:
+    """동일한 문자열을 한 번만 저장하는 UTF-8 문자열 테이블"""
+
+    def __init__(self):
+        self._offsets: dict[str, tuple[int, int]] = {}
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    def add(self, text: str) -> tuple[int, int]:
+        if text not in self._offsets:
+            data = text.encode("utf-8")
+            self._offsets[text] = (self._size, len(data))
+            self._chunks.append(data)
+            self._size += len(data)
+        return self._offsets[text]
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def write_deck(path: str, pages: list[dict], exported_at: float | None = None) -> None:
+    """
+    페이지와 단어 목록을 덱 파일로 씁니다.
+
+    Args:
+        path: 덱 파일 경로
+        pages: [{"id", "title", "summary", "last_edited", "words": [{"word", "meaning", "result"}, ...]}, ...]
+        exported_at: Notion 조회를 시작한 시각 (UNIX 초, 기본값은 현재 시각)
+    """
+    strings = _StringTable()
+    page_records = []
+    word_records = []
+
+    for page in pages:
+        first_word = len(word_records)
+        for w in page["words"]:
+            word_records.append(_WORD.pack(
+                *strings.add(w["word"]),
+                *strings.add(w["meaning"]),
+                _RESULT_TO_CODE.get(w.get("result", ""), 0),
+            ))
+        page_records.append(_PAGE.pack(
+            *strings.add(page["id"]),
+            *strings.add(page["title"]),
+            *strings.add(page.get("summary", "")),
+            *strings.add(page.get("last_edited", "")),
+            first_word,
+            len(word_records) - first_word,
+        ))
+
+    pages_offset = _HEADER.size
+    words_offset = pages_offset + _PAGE.size * len(page_records)
+    strings_offset = words_offset + _WORD.size * len(word_records)
+    string_bytes = strings.to_bytes()
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0,
+        len(page_records), len(word_records),
+        pages_offset, words_offset, strings_offset, len(string_bytes),
+        time.time() if exported_at is None else exported_at,
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.writelines(page_records)
+        f.writelines(word_records)
+        f.write(string_bytes)
+    os.replace(tmp_path, path)
+
+
+class DeckReader:
+    """`mmap`으로 덱 파일을 열어 페이지 단위로 단어를 읽습니다."""
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            ValueError: 형식이 다르거나 비어 있거나 잘린 덱 파일
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"지원하지 않는 덱 파일 형식입니다: {path}")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self._page_count, self._word_count,
+         self._pages_offset, self._words_offset, self._strings_offset,
+         strings_size, self.exported_at) = _HEADER.unpack_from(self._mm, 0)
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or self._pages_offset + self._page_count * _PAGE.size > self._words_offset
+            or self._words_offset + self._word_count * _WORD.size > self._strings_offset
+            or self._strings_offset + strings_size != size
+        ):
+            self._mm.close()
+            raise ValueError(f"지원하지 않는 덱 파일 형식입니다: {path}")
+
+        self._page_index = {
+            self._page_field(i, 0): i for i in range(self._page_count)
+        }
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self._word_count
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _page_record(self, i: int) -> tuple:
+        return _PAGE.unpack_from(self._mm, self._pages_offset + i * _PAGE.size)
+
+    def _page_field(self, i: int, field: int) -> str:
+        record = self._page_record(i)
+        return self._string(record[field * 2], record[field * 2 + 1])
+
+    def _word_range(self, page_id: str) -> range:
+        i = self._page_index.get(page_id)
+        if i is None:
+            return range(0)
+        record = self._page_record(i)
+        return range(record[8], record[8] + record[9])
+
+    def _word(self, j: int) -> dict:
+        word_off, word_len, meaning_off, meaning_len, code = _WORD.unpack_from(
+            self._mm, self._words_offset + j * _WORD.size
+        )
+        return {
+            "word": self._string(word_off, word_len),
+            "meaning": self._string(meaning_off, meaning_len),
+            "result": RESULT_CODES[code] if code < len(RESULT_CODES) else "",
+        }
+
+    def _result_code(self, j: int) -> int:
+        # 단어 레코드의 결과 코드 바이트 (offset/len 4개 뒤)
+        return self._mm[self._words_offset + j * _WORD.size + 16]
+
+    def pages(self) -> list[dict]:
+        """`notion_service.fetch_pages()`와 같은 형태의 페이지 목록"""
+        pages = []
+        for i in range(self._page_count):
+            record = self._page_record(i)
+            pages.append({
+                "id": self._string(record[0], record[1]),
+                "title": self._string(record[2], record[3]),
+                "summary": self._string(record[4], record[5]),
+                "last_edited": self._string(record[6], record[7]),
+            })
+        return pages
+
+    def words(self, page_id: str) -> list[dict]:
+        """`notion_service.fetch_words()`와 같은 형태의 단어 목록"""
+        return [self._word(j) for j in self._word_range(page_id)]
+
+    def wrong_words(self, page_id: str) -> list[dict]:
+        """결과가 ❌/⏰/미기록인 단어만 디코딩해 반환합니다."""
+        return [
+            self._word(j) for j in self._word_range(page_id)
+            if self._result_code(j) in _WRONG_CODES
+        ]
+
+
+def open_deck(path: str = DECK_PATH) -> DeckReader | None:
+    """
+    덱 파일을 엽니다. 파일이 바뀌지 않았다면 이미 열린 리더를 재사용합니다.
+
+    Returns:
+        DeckReader, 파일이 없으면 None
+
+    Raises:
+        ValueError: 형식이 다르거나 비어 있거나 잘린 덱 파일
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    cached = _readers.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    # 파일이 바뀌었거나 사라졌으면 캐시에서만 뺌. 다른 세션이 아직 이전 리더를 쓰고 있을 수 있으므로
+    # 직접 닫지 않고, 마지막 참조가 사라질 때 mmap이 해제되게 둠 (os.replace로 이전 파일 내용은 유효)
+    if cached:
+        _readers.pop(path, None)
+    if mtime is None:
+        return None
+
+    reader = DeckReader(path)
+    _readers[path] = (mtime, reader)
+    return reader
+
+
+def export_deck(path: str = DECK_PATH) -> int:
+    """Notion의 모든 페이지를 덱 파일로 내보냅니다. 저장된 단어 수를 반환합니다."""
+    started = time.time()
+    pages = [{**page, "words": notion_service.fetch_words(page["id"])} for page in notion_service.fetch_pages()]
+    write_deck(path, pages, exported_at=started)
+    return sum(len(p["words"]) for p in pages)
+
+
+def _edited_since(last_edited: str, since: float) -> bool:
+    """
+    Notion `last_edited_time`이 since가 속한 분 이후인지 확인합니다.
+    Notion은 수정 시각을 분 단위로 내림하므로 같은 분의 수정도 이후로 봅니다.
+    """
+    try:
+        edited = datetime.fromisoformat(last_edited.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return True
+    return edited >= since - since % 60
+
+
+def refresh_deck(path: str = DECK_PATH) -> tuple[int, int]:
+    """
+    기존 덱 파일을 기준으로 수정 시각이 바뀌었거나 직전 내보내기와 같은 분 이후에 수정된
+    페이지의 단어만 Notion에서 다시 가져옵니다.
+    "database" 저장 방식에서는 단어 행을 수정해도 목차 페이지의 수정 시각이 바뀌지 않으므로 모든 페이지를 다시 가져옵니다.
+    덱 파일이 손상되었거나 이전 형식이면 전체를 다시 가져옵니다.
+
+    Returns:
+        (다시 가져온 페이지 수, 전체 페이지 수)
+    """
+    cached_pages: dict[str, dict] = {}
+    exported_at = 0.0
+    if os.path.exists(path):
+        try:
+            reader = DeckReader(path)
+        except ValueError:
+            reader = None
+        if reader is not None:
+            try:
+                exported_at = reader.exported_at
+                for page in reader.pages():
+                    cached_pages[page["id"]] = {**page, "words": reader.words(page["id"])}
+            finally:
+                reader.close()
+
+    started = time.time()
+    pages = []
+    fetched = 0
+    for page in notion_service.fetch_pages():
+        cached = cached_pages.get(page["id"]) if NOTION_STORAGE != "database" else None
+        if (
+            cached
+            and page["last_edited"]
+            and cached["last_edited"] == page["last_edited"]
+            and not _edited_since(page["last_edited"], exported_at)
+        ):
+            pages.append({**page, "words": cached["words"]})
+        else:
+            pages.append({**page, "words": notion_service.fetch_words(page["id"])})
+            fetched += 1
+
+    write_deck(path, pages, exported_at=started)
+    return fetched, len(pages)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    deck_path = sys.argv[2] if len(sys.argv) > 2 else DECK_PATH
+
+    if command == "export":
+        print(f"✅ {export_deck(deck_path)}개의 단어를 {deck_path}에 저장했습니다.")
+    elif command == "refresh":
+        fetched, total = refresh_deck(deck_path)
+        print(f"✅ {total}개 페이지 중 {fetched}개를 새로 가져와 {deck_path}를 갱신했습니다.")
+    else:
+        print("사용법: python -m services.deck_service [export|refresh] [경로]")
+        sys.exit(1)
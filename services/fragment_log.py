@@ -0,0 +1,28 @@
+"""프래그먼트 실행 기록
+
+프래그먼트가 서버에서 실제로 실행된 시각을 세션별로 메모리에 남깁니다.
+퀴즈 타이머는 브라우저가 1초마다 보내는 요청으로 다시 실행되므로, 요청 시각과 이 기록을 비교하면
+서버 쪽에서 tick이 얼마나 늦게 처리되었는지 알 수 있습니다 (load_test.py에서 사용).
+"""
+import threading
+import time
+from collections import deque
+
+# 최근 실행만 보관 (세션 50개가 1초마다 tick해도 수 분 분량)
+MAX_RUNS = 50_000
+
+_lock = threading.Lock()
+_runs: deque = deque(maxlen=MAX_RUNS)
+
+
+def record(session_id: str, name: str) -> None:
+    """프래그먼트 실행 시작 시각(time.time)을 기록합니다."""
+    with _lock:
+        _runs.append((session_id, name, time.time()))
+
+
+def get_runs() -> list[dict]:
+    """기록된 프래그먼트 실행 목록을 반환합니다 (오래된 순)."""
+    with _lock:
+        runs = list(_runs)
+    return [{"session_id": s, "name": n, "time": t} for s, n, t in runs]
@@ -0,0 +1,219 @@
+"""Gemini 호출 스케줄러
+
+모든 Gemini 요청을 다음 규칙으로 실행합니다.
+
+- 프로세스 전체 동시 요청 수 제한 (`GEMINI_MAX_CONCURRENCY`, 모든 요청 합계)
+  이 중 `RESERVED_SLOTS`개는 대체 모델 요청만 사용할 수 있습니다. 느린 요청은 취소할 수 없으므로,
+  예약분이 없으면 예산이 가득 찼을 때 대체 요청이 우회하려던 느린 요청 뒤에서 기다리게 됩니다.
+- 할당량 초과/일시적 오류는 지수 백오프로 재시도 (`GEMINI_MAX_RETRIES`)
+- 응답이 `GEMINI_HEDGE_AFTER_SECONDS`보다 늦으면 같은 모델로 두 번째 요청을 보내 먼저 온 응답 사용 (0이면 끔)
+  예약분을 제외한 예산이 가득 차 있으면 헤지하지 않고 첫 요청을 계속 기다립니다.
+- 모델이 `GEMINI_SLO_SECONDS` 안에 응답하지 못하거나 실패하면 `GEMINI_FALLBACK_MODELS`의 다음 모델로 전환
+  (이전 모델의 요청은 취소하지 않고 함께 기다리며, 먼저 성공한 결과를 사용)
+
+어떤 경로(모델, 재시도 횟수, 헤지 여부)로 응답했는지는 `get_serving_log()`로 확인할 수 있습니다.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from google.api_core import exceptions as google_exceptions
+
+from config import (
+    GEMINI_FALLBACK_MODELS,
+    GEMINI_HEDGE_AFTER_SECONDS,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_MAX_RETRIES,
+    GEMINI_MODEL,
+    GEMINI_SLO_SECONDS,
+)
+
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 16.0
+
+# 대체 모델 요청 전용으로 남겨 두는 슬롯 수 (예산이 1이면 예약하지 않음)
+RESERVED_SLOTS = min(GEMINI_MAX_CONCURRENCY - 1, max(1, GEMINI_MAX_CONCURRENCY // 4))
+
+# 요청 종류(lane): 첫 모델 요청, 헤지 요청, 대체 모델 요청. 모두 하나의 예산을 나눠 씁니다.
+_LANES = ("primary", "hedge", "fallback")
+_slots = threading.Condition()
+_slots_in_use = 0
+# 모델별 실행(재시도 루프)과 개별 요청을 서로 다른 풀에서 돌려 교착을 막고,
+# 예산을 기다리는 스레드가 다른 lane의 작업을 막지 않도록 lane마다 풀을 따로 둡니다.
+_model_executors = {
+    lane: ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENCY * 2, thread_name_prefix=f"gemini-{lane}-model")
+    for lane in ("primary", "fallback")
+}
+_request_executors = {
+    lane: ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENCY * 2, thread_name_prefix=f"gemini-{lane}-request")
+    for lane in _LANES
+}
+
+_log_lock = threading.Lock()
+_serving_log: deque = deque(maxlen=200)
+
+
+def _acquire_slot(lane: str, blocking: bool = True) -> bool:
+    """
+    전체 예산에서 슬롯 하나를 얻습니다. 대체 모델 요청만 예약분까지 쓸 수 있습니다.
+
+    Returns:
+        슬롯을 얻었는지 여부 (blocking=False이고 여유가 없으면 False)
+    """
+    global _slots_in_use
+    limit = GEMINI_MAX_CONCURRENCY if lane == "fallback" else GEMINI_MAX_CONCURRENCY - RESERVED_SLOTS
+    with _slots:
+        while _slots_in_use >= limit:
+            if not blocking:
+                return False
+            _slots.wait()
+        _slots_in_use += 1
+        return True
+
+
+def _release_slot() -> None:
+    global _slots_in_use
+    with _slots:
+        _slots_in_use -= 1
+        _slots.notify_all()
+
+
+def _request(fn, model_name: str, lane: str, acquired: bool = False):
+    """예산 안에서 요청 1회를 실행합니다. acquired면 이미 얻은 슬롯을 사용합니다."""
+    if not acquired:
+        _acquire_slot(lane)
+    try:
+        return fn(model_name)
+    finally:
+        _release_slot()
+
+
+def _submit_request(fn, model_name: str, lane: str, acquired: bool = False) -> Future:
+    return _request_executors[lane].submit(_request, fn, model_name, lane, acquired)
+
+
+def _hedged_request(fn, model_name: str, lane: str) -> tuple[object, bool]:
+    """
+    요청 1회를 보내고, 헤지 기준 시간이 지나도 응답이 없으면 같은 요청을 한 번 더 보냅니다.
+    이때 예산에 여유가 없으면 헤지하지 않고 첫 요청을 기다립니다.
+
+    Returns:
+        (결과, 헤지 요청이 응답했는지 여부)
+    """
+    primary = _submit_request(fn, model_name, lane)
+    if GEMINI_HEDGE_AFTER_SECONDS <= 0:
+        return primary.result(), False
+
+    done, _ = wait([primary], timeout=GEMINI_HEDGE_AFTER_SECONDS)
+    if done:
+        return primary.result(), False
+
+    if not _acquire_slot("hedge", blocking=False):
+        return primary.result(), False
+    hedge = _submit_request(fn, model_name, "hedge", acquired=True)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), future is hedge
+            error = future.exception()
+    raise error
+
+
+def _run_model(fn, model_name: str, lane: str) -> dict:
+    """재시도 가능한 오류는 지수 백오프(지터 포함)로 다시 시도합니다."""
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        try:
+            result, hedged = _hedged_request(fn, model_name, lane)
+            return {"result": result, "model": model_name, "retries": attempt, "hedged": hedged}
+        except RETRYABLE_ERRORS:
+            if attempt == GEMINI_MAX_RETRIES:
+                raise
+            delay = min(BACKOFF_BASE_SECONDS * 2 ** attempt, BACKOFF_MAX_SECONDS)
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+
+def _record(entry: dict) -> None:
+    with _log_lock:
+        _serving_log.append(entry)
+
+
+def call(name: str, fn):
+    """
+    `fn(model_name)`을 스케줄러 규칙에 따라 실행하고 결과를 반환합니다.
+
+    Args:
+        name: 로그에 남길 호출 이름 (예: "analyze_image")
+        fn: 모델 이름을 받아 Gemini를 호출하는 함수
+
+    Raises:
+        모든 모델이 실패하면 마지막 오류
+    """
+    chain = [GEMINI_MODEL] + [m for m in GEMINI_FALLBACK_MODELS if m != GEMINI_MODEL]
+    started = time.monotonic()
+    pending: dict[Future, str] = {}
+    slo_missed = []
+    error = None
+    next_index = 0
+    deadline = None
+
+    while True:
+        # 최신 모델이 SLO를 넘겼거나 실패했으면 다음 모델 요청 시작
+        latest = chain[next_index - 1] if next_index else None
+        latest_running = latest in pending.values()
+        slo_over = deadline is not None and time.monotonic() >= deadline
+        if next_index < len(chain) and (not latest_running or slo_over):
+            if latest_running:
+                slo_missed.append(latest)
+            lane = "primary" if next_index == 0 else "fallback"
+            future = _model_executors[lane].submit(_run_model, fn, chain[next_index], lane)
+            pending[future] = chain[next_index]
+            next_index += 1
+            deadline = time.monotonic() + GEMINI_SLO_SECONDS if next_index < len(chain) else None
+
+        if not pending:
+            break
+
+        timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            del pending[future]
+            if future.exception() is None:
+                served = future.result()
+                _record({
+                    "name": name,
+                    "model": served["model"],
+                    "retries": served["retries"],
+                    "hedged": served["hedged"],
+                    "fallback": served["model"] != GEMINI_MODEL,
+                    "slo_missed": slo_missed,
+                    "elapsed": time.monotonic() - started,
+                })
+                return served["result"]
+            error = future.exception()
+
+    _record({
+        "name": name,
+        "model": None,
+        "error": str(error),
+        "slo_missed": slo_missed,
+        "elapsed": time.monotonic() - started,
+    })
+    raise error
+
+
+def get_serving_log() -> list[dict]:
+    """최근 Gemini 호출이 어떤 경로로 처리되었는지 반환합니다 (최신순)."""
+    with _log_lock:
+        return list(reversed(_serving_log))
@@ -1,10 +1,22 @@
 """Gemini AI 이미지 분석 서비스"""
 import json
+import math
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 import google.generativeai as genai
 from PIL import Image
 import io
 
-from config import GEMINI_API_KEY, GEMINI_MODEL
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_TILE_MIN_PIXELS,
+    GEMINI_TILE_OVERLAP,
+    GEMINI_TILE_SIZE,
+)
+from services import gemini_scheduler
+
+# 타일 1장당 분석 시도 횟수 (실패한 타일은 건너뜀)
+TILE_ATTEMPTS = 2
 
 
 def _configure():
@@ -12,22 +24,7 @@ def _configure():
     genai.configure(api_key=GEMINI_API_KEY)
 
 
-def analyze_image(image_bytes: bytes) -> list[dict]:
-    """
-    이미지에서 영어 단어와 한국어 뜻을 추출합니다.
-
-    Args:
-        image_bytes: 업로드된 이미지의 바이트 데이터
-
-    Returns:
-        [{"word": "apple", "meaning": "사과"}, ...] 형태의 리스트
-    """
-    _configure()
-
-    model = genai.GenerativeModel(GEMINI_MODEL)
-    image = Image.open(io.BytesIO(image_bytes))
-
-    prompt = """이 이미지에서 영어 단어와 한국어 뜻을 추출해주세요.
+_EXTRACT_PROMPT = """이 이미지에서 영어 단어와 한국어 뜻을 추출해주세요.
 
 반드시 아래 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요.
 [
@@ -37,21 +34,127 @@ def analyze_image(image_bytes: bytes) -> list[dict]:
 
 만약 이미지에서 영어 단어를 찾을 수 없으면 빈 배열 []을 반환하세요."""
 
+_TILE_PROMPT_SUFFIX = """
+
+이 이미지는 큰 페이지의 일부분입니다. 가장자리에서 잘려 글자가 온전히 보이지 않는 단어는 제외하세요."""
+
+
+def _extract_words(image: Image.Image, prompt: str, name: str = "analyze_image") -> list[dict]:
+    """이미지 1장을 Gemini로 분석해 단어 목록을 반환합니다."""
+    text = gemini_scheduler.call(
+        name,
+        lambda model_name: genai.GenerativeModel(model_name).generate_content([prompt, image]).text,
+    ).strip()
+
+    # JSON 블록 마커 제거
+    if text.startswith("```"):
+        lines = text.split("\n")
+        text = "\n".join(lines[1:-1])
+
+    words = json.loads(text)
+
+    if not isinstance(words, list):
+        raise ValueError("응답이 리스트 형식이 아닙니다.")
+
+    return words
+
+
+def _split_tiles(image: Image.Image) -> list[Image.Image]:
+    """이미지를 서로 겹치는 타일로 나눕니다 (행 우선 순서)."""
+    width, height = image.size
+    cols = max(1, math.ceil(width / GEMINI_TILE_SIZE))
+    rows = max(1, math.ceil(height / GEMINI_TILE_SIZE))
+    tile_w = math.ceil(width / cols)
+    tile_h = math.ceil(height / rows)
+    overlap_w = int(tile_w * GEMINI_TILE_OVERLAP)
+    overlap_h = int(tile_h * GEMINI_TILE_OVERLAP)
+
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            box = (
+                max(0, col * tile_w - overlap_w),
+                max(0, row * tile_h - overlap_h),
+                min(width, (col + 1) * tile_w + overlap_w),
+                min(height, (row + 1) * tile_h + overlap_h),
+            )
+            tiles.append(image.crop(box))
+    return tiles
+
+
+def _merge_tile_words(tile_words: list[list[dict]]) -> list[dict]:
+    """타일별 결과를 순서대로 합치며, 겹침 영역에서 중복 추출된 단어를 제거합니다."""
+    merged = {}
+    for words in tile_words:
+        for w in words:
+            key = " ".join(str(w.get("word", "")).lower().split())
+            if key and key not in merged:
+                merged[key] = w
+    return list(merged.values())
+
+
+def _extract_tile_words(tile: Image.Image) -> list[dict] | None:
+    """
+    타일 1장을 분석합니다. 빈 여백 타일 등에서 JSON이 아닌 응답이 오면 한 번 더 시도하고,
+    그래도 파싱할 수 없으면 None을 반환해 해당 타일만 건너뜁니다.
+    할당량 초과 등 스케줄러가 재시도한 뒤에도 실패한 오류는 그대로 전달합니다.
+    """
+    prompt = _EXTRACT_PROMPT + _TILE_PROMPT_SUFFIX
+    for _ in range(TILE_ATTEMPTS):
+        try:
+            return _extract_words(tile, prompt, "analyze_image_tile")
+        except ValueError:  # json.JSONDecodeError 포함
+            continue
+    return None
+
+
+def _analyze_tiles(image: Image.Image) -> tuple[list[dict], int]:
+    """
+    타일을 동시에 분석한 뒤 성공한 타일의 결과를 합칩니다.
+    모든 타일이 실패하면 이미지 전체를 한 번에 분석합니다.
+    Gemini 호출 자체가 실패하면 남은 타일은 취소하고 바로 예외를 전달합니다.
+
+    Returns:
+        (단어 목록, 응답을 파싱하지 못해 건너뛴 타일 수)
+    """
+    tiles = _split_tiles(image)
+    executor = ThreadPoolExecutor(max_workers=min(len(tiles), GEMINI_MAX_CONCURRENCY))
     try:
-        response = model.generate_content([prompt, image])
-        text = response.text.strip()
+        futures = [executor.submit(_extract_tile_words, tile) for tile in tiles]
+        # 어느 타일이든 먼저 실패하면 나머지를 기다리지 않고 예외를 전달
+        wait(futures, return_when=FIRST_EXCEPTION)
+        results = [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    tile_words = [words for words in results if words is not None]
+    if not tile_words:
+        return _extract_words(image, _EXTRACT_PROMPT), 0
+    return _merge_tile_words(tile_words), len(tiles) - len(tile_words)
 
-        # JSON 블록 마커 제거
-        if text.startswith("```"):
-            lines = text.split("\n")
-            text = "\n".join(lines[1:-1])
 
-        words = json.loads(text)
+def analyze_image(image_bytes: bytes, tiled: bool = False) -> tuple[list[dict], int]:
+    """
+    이미지에서 영어 단어와 한국어 뜻을 추출합니다.
+
+    Args:
+        image_bytes: 업로드된 이미지의 바이트 데이터
+        tiled: True이고 이미지가 `GEMINI_TILE_MIN_PIXELS` 이상이면 겹치는 타일로 나눠 동시에 분석합니다.
+               작은 이미지는 항상 한 번에 분석합니다.
+
+    Returns:
+        ([{"word": "apple", "meaning": "사과"}, ...], 건너뛴 타일 수)
+        건너뛴 타일이 있으면 그 영역의 단어가 빠졌을 수 있습니다. 한 번에 분석하면 항상 0입니다.
+    """
+    _configure()
 
-        if not isinstance(words, list):
-            raise ValueError("응답이 리스트 형식이 아닙니다.")
+    image = Image.open(io.BytesIO(image_bytes))
+    image.load()
 
-        return words
+    try:
+        if tiled and image.width * image.height >= GEMINI_TILE_MIN_PIXELS:
+            return _analyze_tiles(image)
+        return _extract_words(image, _EXTRACT_PROMPT), 0
 
     except json.JSONDecodeError:
         raise ValueError(
@@ -74,7 +177,6 @@ def generate_summary(words: list[dict]) -> str:
     """
     _configure()
 
-    model = genai.GenerativeModel(GEMINI_MODEL)
     word_list = ", ".join([w["word"] for w in words])
 
     prompt = f"""다음 영어 단어들의 공통 주제를 한국어로 짧게 요약해주세요 (10자 이내).
@@ -84,7 +186,11 @@ def generate_summary(words: list[dict]) -> str:
 """
 
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip().strip('"').strip("'")
+        text = gemini_scheduler.call(
+            "generate_summary",
+            lambda model_name: genai.GenerativeModel(model_name).generate_content(prompt).text,
+        )
+        return text.strip().strip('"').strip("'")
     except Exception:
+        # 재시도/대체 모델까지 모두 실패한 경우 (실패 경로는 스케줄러 로그에 기록됨)
         return "단어 모음"
@@ -0,0 +1,289 @@
+"""Notion API 비동기 연동 서비스
+
+`notion_service`와 같은 기능을 `AsyncClient`로 제공하며, 서로 독립적인 요청
+(여러 테이블 블록 조회, 행 단위 결과 업데이트 등)을 동시에 보냅니다.
+동시 요청 수는 프로세스 전체에서 공유하는 세마포어(`NOTION_MAX_CONCURRENCY`)로 제한합니다.
+
+Streamlit처럼 동기 코드에서 호출할 때는 `run()`을 사용합니다:
+    page_title = notion_async_service.run(notion_async_service.save_words(words, summary))
+
+`fetch_pages()` / `fetch_words()`는 동기 버전과 같이 동시에 들어온 같은 요청을 하나로 합칩니다.
+"""
+import asyncio
+import concurrent.futures
+import copy
+import threading
+from datetime import datetime
+from notion_client import AsyncClient
+
+from config import (
+    NOTION_TOKEN,
+    NOTION_DATABASE_ID,
+    NOTION_MAX_CONCURRENCY,
+    NOTION_STORAGE,
+    NOTION_TIMEOUT_SECONDS,
+    NOTION_WORDS_DATABASE_ID,
+)
+from services import word_index
+from services.notion_service import (
+    _WORDS_QUERY_CHUNK,
+    _flight_lock,
+    _flight_stats,
+    _is_wrong,
+    _page_properties,
+    _parse_next_seq,
+    _parse_page,
+    _parse_table_rows,
+    _parse_word_row,
+    _result_row_updates,
+    _seq_query,
+    _word_row_properties,
+    _word_rows_query,
+    _word_table_blocks,
+)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+# 아래 객체는 이벤트 루프 스레드 안에서만 생성/사용됩니다.
+_client: AsyncClient | None = None
+_semaphore: asyncio.Semaphore | None = None
+# 동일한 읽기 요청 합치기: {키: 진행 중인 Task}
+_in_flight: dict[tuple, asyncio.Task] = {}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """백그라운드 스레드에서 도는 공용 이벤트 루프를 반환합니다."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="notion-async", daemon=True).start()
+    return _loop
+
+
+def submit(coro) -> concurrent.futures.Future:
+    """코루틴을 공용 이벤트 루프에 예약하고 결과를 기다리지 않고 Future를 반환합니다."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def result(future: concurrent.futures.Future, timeout: float = NOTION_TIMEOUT_SECONDS):
+    """
+    `submit()`으로 예약한 작업의 결과를 기다립니다.
+
+    Raises:
+        TimeoutError: timeout초 안에 끝나지 않은 경우 (작업은 취소됩니다)
+    """
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Notion 요청이 {timeout:g}초 안에 끝나지 않았습니다.") from None
+
+
+def run(coro, timeout: float = NOTION_TIMEOUT_SECONDS):
+    """
+    코루틴을 공용 이벤트 루프에서 실행하고 결과를 기다립니다.
+
+    Raises:
+        TimeoutError: timeout초 안에 끝나지 않은 경우 (코루틴은 취소됩니다)
+    """
+    return result(submit(coro), timeout)
+
+
+def _get_client() -> AsyncClient:
+    """Notion 비동기 클라이언트 (루프당 1개)"""
+    global _client
+    if _client is None:
+        _client = AsyncClient(auth=NOTION_TOKEN)
+    return _client
+
+
+async def _request(method, **kwargs) -> dict:
+    """공유 세마포어 안에서 Notion 요청을 보냅니다."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(NOTION_MAX_CONCURRENCY)
+    async with _semaphore:
+        return await method(**kwargs)
+
+
+async def _query_all(**query) -> list[dict]:
+    """페이지네이션을 따라가며 DB 쿼리 결과를 모두 가져옵니다."""
+    client = _get_client()
+    rows = []
+    cursor = None
+    while True:
+        results = await _request(client.databases.query, **query, **({"start_cursor": cursor} if cursor else {}))
+        rows.extend(results["results"])
+        if not results.get("has_more"):
+            return rows
+        cursor = results["next_cursor"]
+
+
+async def _list_children(block_id: str) -> dict:
+    """페이지네이션을 따라가며 블록의 자식을 모두 가져옵니다 ({"results": [...]} 형태)."""
+    client = _get_client()
+    children = []
+    cursor = None
+    while True:
+        results = await _request(
+            client.blocks.children.list, block_id=block_id, **({"start_cursor": cursor} if cursor else {})
+        )
+        children.extend(results["results"])
+        if not results.get("has_more"):
+            return {"results": children}
+        cursor = results["next_cursor"]
+
+
+async def _single_flight(key: tuple, factory):
+    """
+    같은 키의 요청이 이미 진행 중이면 그 Task의 결과를 함께 받습니다.
+    Task는 shield로 감싸 한 호출자가 취소(타임아웃)되어도 나머지 호출자는 계속 기다릴 수 있습니다.
+    """
+    with _flight_lock:
+        _flight_stats["calls"] += 1
+        if key in _in_flight:
+            _flight_stats["coalesced"] += 1
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    # 호출자마다 독립된 결과를 받도록 복사
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+async def save_words(words: list[dict], summary: str, skip_known: bool = False) -> str:
+    """
+    Notion DB에 새 페이지를 생성하고, 페이지 내부에 3열 단어 테이블을 추가합니다.
+
+    동기 버전과 달리 테이블 블록을 `pages.create`의 children으로 함께 보내
+    `blocks.children.append` 왕복 1회를 줄입니다.
+    "database" 저장 방식에서는 단어 행들을 동시에 생성합니다.
+    """
+    if skip_known:
+        words, _ = word_index.split_known(words)
+        if not words:
+            raise ValueError("저장할 새 단어가 없습니다. 모든 단어가 이미 등록되어 있습니다.")
+
+    client = _get_client()
+    today = datetime.now().strftime("%Y-%m-%d")
+    seq = _parse_next_seq(await _request(client.databases.query, **_seq_query()))
+    page_title = f"{today}-{seq:02d}-{summary}"
+
+    if NOTION_STORAGE == "database":
+        new_page = await _request(
+            client.pages.create,
+            parent={"database_id": NOTION_DATABASE_ID},
+            properties=_page_properties(page_title, summary),
+        )
+        await asyncio.gather(*[
+            _request(
+                client.pages.create,
+                parent={"database_id": NOTION_WORDS_DATABASE_ID},
+                properties=_word_row_properties(w, new_page["id"]),
+            )
+            for w in words
+        ])
+    else:
+        new_page = await _request(
+            client.pages.create,
+            parent={"database_id": NOTION_DATABASE_ID},
+            properties=_page_properties(page_title, summary),
+            children=_word_table_blocks(words),
+        )
+
+    word_index.add_words(words, new_page["id"], page_title)
+    return page_title
+
+
+async def fetch_pages() -> list[dict]:
+    """목차 DB에서 페이지 목록을 조회합니다. 동시에 들어온 같은 요청은 하나로 합칩니다."""
+    return await _single_flight(("pages",), _fetch_pages)
+
+
+async def _fetch_pages() -> list[dict]:
+    results = await _query_all(
+        database_id=NOTION_DATABASE_ID,
+        sorts=[{"property": "날짜+순번", "direction": "descending"}],
+    )
+
+    return [_parse_page(page) for page in results]
+
+
+async def fetch_words(page_id: str, only_wrong: bool = False) -> list[dict]:
+    """
+    특정 페이지의 단어 목록을 조회합니다. 테이블 블록이 여러 개면 동시에 조회합니다.
+    같은 페이지에 대한 동시 요청은 하나로 합칩니다.
+
+    Args:
+        only_wrong: True면 결과가 ❌/⏰/없음인 단어만 반환합니다.
+    """
+    return await _single_flight(
+        ("words", page_id, only_wrong), lambda: _fetch_words(page_id, only_wrong)
+    )
+
+
+async def _fetch_words(page_id: str, only_wrong: bool) -> list[dict]:
+    if NOTION_STORAGE == "database":
+        rows = await _query_all(**_word_rows_query(page_id, only_wrong=only_wrong))
+        return [w for w in map(_parse_word_row, rows) if w["word"] and w["meaning"]]
+
+    blocks = await _list_children(page_id)
+    tables = [block for block in blocks["results"] if block["type"] == "table"]
+
+    table_rows = await asyncio.gather(*[_list_children(block["id"]) for block in tables])
+
+    words = []
+    for block, rows in zip(tables, table_rows):
+        table_width = block.get("table", {}).get("table_width", 2)
+        words.extend(_parse_table_rows(rows, table_width))
+
+    return [w for w in words if _is_wrong(w)] if only_wrong else words
+
+
+async def update_word_results(page_id: str, results: list[dict]) -> None:
+    """
+    퀴즈 결과를 Notion 페이지의 단어 테이블에 업데이트합니다.
+    행 단위 `blocks.update` 요청을 동시에 보냅니다.
+
+    Args:
+        page_id: Notion 페이지 ID
+        results: [{"word": "apple", "result": "✅"}, ...]
+    """
+    client = _get_client()
+
+    if NOTION_STORAGE == "database":
+        result_map = {r["word"]: r["result"] for r in results}
+        words = list(result_map)
+        row_lists = await asyncio.gather(*[
+            _query_all(**_word_rows_query(page_id, words=words[i:i + _WORDS_QUERY_CHUNK]))
+            for i in range(0, len(words), _WORDS_QUERY_CHUNK)
+        ])
+        await asyncio.gather(*[
+            _request(
+                client.pages.update,
+                page_id=row["id"],
+                properties={"결과": {"select": {"name": result_map[_parse_word_row(row)["word"]]}}},
+            )
+            for rows in row_lists
+            for row in rows
+            if _parse_word_row(row)["word"] in result_map
+        ])
+        return
+
+    blocks = await _list_children(page_id)
+
+    for block in blocks["results"]:
+        if block["type"] == "table":
+            table_width = block.get("table", {}).get("table_width", 2)
+            table_rows = await _list_children(block["id"])
+
+            await asyncio.gather(*[
+                _request(client.blocks.update, block_id=row_id, table_row={"cells": new_cells})
+                for row_id, new_cells in _result_row_updates(table_rows, table_width, results)
+            ])
+            break
@@ -1,8 +1,31 @@
-"""Notion API 연동 서비스"""
+"""Notion API 연동 서비스
+
+단어 저장 방식은 `NOTION_STORAGE`로 선택합니다.
+
+- "table" (기본): 목차 DB 페이지 안의 3열 테이블 블록에 단어 저장
+- "database": 단어 DB(`NOTION_WORDS_DATABASE_ID`)의 행 하나에 단어 하나를 저장하고
+  `페이지` relation으로 목차 페이지와 연결. 오답 필터와 결과 업데이트가 서버 측 쿼리로 처리됩니다.
+  기존 테이블 블록은 `python -m services.notion_service migrate`로 옮길 수 있습니다.
+"""
+import copy
+import sys
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from notion_client import Client
 
-from config import NOTION_TOKEN, NOTION_DATABASE_ID
+from config import NOTION_TOKEN, NOTION_DATABASE_ID, NOTION_STORAGE, NOTION_WORDS_DATABASE_ID
+from services import word_index
+
+
+WRONG_RESULTS = ("❌", "⏰", "")
+# 결과 업데이트 시 한 번의 쿼리로 찾을 단어 수 (Word 제목 or 필터 크기)
+_WORDS_QUERY_CHUNK = 50
+
+# 동일한 읽기 요청 합치기 (single-flight): {키: 진행 중인 요청의 Future}
+_flight_lock = threading.Lock()
+_in_flight: dict[tuple, Future] = {}
+_flight_stats = {"calls": 0, "coalesced": 0}
 
 
 def _get_client() -> Client:
@@ -10,21 +33,70 @@ def _get_client() -> Client:
     return Client(auth=NOTION_TOKEN)
 
 
-def _get_next_seq(client: Client) -> int:
-    """오늘 날짜의 다음 순번을 반환합니다."""
-    today = datetime.now().strftime("%Y-%m-%d")
+def _single_flight(key: tuple, fn, *args):
+    """
+    같은 키의 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 함께 받습니다.
+    먼저 도착한 호출만 Notion에 요청하며, 실패하면 기다리던 호출에도 같은 예외가 전달됩니다.
+    """
+    with _flight_lock:
+        _flight_stats["calls"] += 1
+        future = _in_flight.get(key)
+        if future is None:
+            future = Future()
+            _in_flight[key] = future
+            is_leader = True
+        else:
+            _flight_stats["coalesced"] += 1
+            is_leader = False
+
+    if not is_leader:
+        # 호출자마다 독립된 결과를 받도록 복사
+        return copy.deepcopy(future.result())
 
-    results = client.databases.query(
-        database_id=NOTION_DATABASE_ID,
-        filter={
+    try:
+        result = fn(*args)
+        # 기다리던 호출이 복사하는 동안 호출자가 결과를 수정해도 영향이 없도록 먼저 복사
+        own = copy.deepcopy(result)
+    except BaseException as e:
+        # KeyboardInterrupt/SystemExit도 전달해야 기다리던 호출이 멈추지 않음
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return own
+    finally:
+        with _flight_lock:
+            _in_flight.pop(key, None)
+
+
+def get_single_flight_stats() -> dict:
+    """
+    읽기 요청 합치기 통계를 반환합니다.
+
+    Returns:
+        {"calls": 전체 호출 수, "coalesced": 진행 중인 요청에 합쳐진 호출 수, "in_flight": 현재 진행 중인 요청 수}
+    """
+    with _flight_lock:
+        return {**_flight_stats, "in_flight": len(_in_flight)}
+
+
+def _seq_query() -> dict:
+    """오늘 날짜 페이지를 순번 내림차순으로 찾는 쿼리 인자"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    return {
+        "database_id": NOTION_DATABASE_ID,
+        "filter": {
             "property": "날짜+순번",
             "title": {"starts_with": today},
         },
-        sorts=[
+        "sorts": [
             {"property": "날짜+순번", "direction": "descending"}
         ],
-    )
+    }
+
 
+def _parse_next_seq(results: dict) -> int:
+    """오늘 날짜 페이지 조회 결과에서 다음 순번을 계산합니다."""
     if not results["results"]:
         return 1
 
@@ -38,28 +110,26 @@ def _get_next_seq(client: Client) -> int:
         return 1
 
 
-def save_words(words: list[dict], summary: str) -> str:
-    """Notion DB에 새 페이지를 생성하고, 페이지 내부에 3열 단어 테이블을 추가합니다."""
-    client = _get_client()
-    today = datetime.now().strftime("%Y-%m-%d")
-    seq = _get_next_seq(client)
-    page_title = f"{today}-{seq:02d}-{summary}"
+def _get_next_seq(client: Client) -> int:
+    """오늘 날짜의 다음 순번을 반환합니다."""
+    return _parse_next_seq(client.databases.query(**_seq_query()))
 
-    new_page = client.pages.create(
-        parent={"database_id": NOTION_DATABASE_ID},
-        properties={
-            "날짜+순번": {
-                "title": [{"text": {"content": page_title}}]
-            },
-            "요약": {
-                "rich_text": [{"text": {"content": summary}}]
-            },
+
+def _page_properties(page_title: str, summary: str) -> dict:
+    """목차 DB 행의 속성"""
+    return {
+        "날짜+순번": {
+            "title": [{"text": {"content": page_title}}]
         },
-    )
+        "요약": {
+            "rich_text": [{"text": {"content": summary}}]
+        },
+    }
 
-    page_id = new_page["id"]
 
-    children = [
+def _word_table_blocks(words: list[dict]) -> list[dict]:
+    """페이지에 추가할 제목 + 3열 단어 테이블 블록"""
+    return [
         {
             "object": "block",
             "type": "heading_2",
@@ -103,67 +173,262 @@ def save_words(words: list[dict], summary: str) -> str:
         },
     ]
 
-    client.blocks.children.append(block_id=page_id, children=children)
+
+def _parse_page(page: dict) -> dict:
+    """목차 DB 행을 {"id", "title", "summary", "last_edited"}로 변환합니다."""
+    title_prop = page["properties"]["날짜+순번"]["title"]
+    summary_prop = page["properties"]["요약"]["rich_text"]
+
+    title = title_prop[0]["plain_text"] if title_prop else "(제목 없음)"
+    summary = summary_prop[0]["plain_text"] if summary_prop else ""
+
+    return {
+        "id": page["id"],
+        "title": title,
+        "summary": summary,
+        "last_edited": page.get("last_edited_time", ""),
+    }
+
+
+def _parse_table_rows(table_rows: dict, table_width: int) -> list[dict]:
+    """테이블 행 목록에서 단어를 추출합니다 (헤더 행 제외)."""
+    words = []
+
+    for i, row in enumerate(table_rows["results"]):
+        if i == 0:
+            continue
+
+        if row["type"] == "table_row":
+            cells = row["table_row"]["cells"]
+            if len(cells) >= 2:
+                word_text = cells[0][0]["plain_text"] if cells[0] else ""
+                meaning_text = cells[1][0]["plain_text"] if cells[1] else ""
+                result_text = ""
+                if table_width >= 3 and len(cells) >= 3 and cells[2]:
+                    result_text = cells[2][0]["plain_text"] if cells[2] else ""
+
+                if word_text and meaning_text:
+                    words.append({
+                        "word": word_text,
+                        "meaning": meaning_text,
+                        "result": result_text,
+                    })
+
+    return words
+
+
+def _result_row_updates(table_rows: dict, table_width: int, results: list[dict]) -> list[tuple[str, list]]:
+    """
+    퀴즈 결과를 반영할 테이블 행과 새 셀 목록을 계산합니다.
+
+    Returns:
+        [(row_block_id, new_cells), ...]
+    """
+    result_map = {r["word"]: r["result"] for r in results}
+    updates = []
+
+    for i, row in enumerate(table_rows["results"]):
+        if i == 0:
+            continue
+
+        if row["type"] == "table_row":
+            cells = row["table_row"]["cells"]
+            word = cells[0][0]["plain_text"] if cells[0] else ""
+
+            if word in result_map:
+                emoji = result_map[word]
+                if table_width >= 3:
+                    new_cells = [
+                        cells[0],
+                        cells[1],
+                        [{"type": "text", "text": {"content": emoji}}],
+                    ]
+                else:
+                    meaning = cells[1][0]["plain_text"] if cells[1] else ""
+                    new_cells = [
+                        cells[0],
+                        [{"type": "text", "text": {"content": f"{meaning} {emoji}"}}],
+                    ]
+                updates.append((row["id"], new_cells))
+
+    return updates
+
+
+def _is_wrong(word: dict) -> bool:
+    """오답만 출제 대상인지 (❌/⏰/결과 없음)"""
+    return word.get("result") in WRONG_RESULTS
+
+
+def _word_row_properties(word: dict, page_id: str) -> dict:
+    """단어 DB 행의 속성. 결과가 없으면(미응시) 오답 필터에 포함되도록 select를 비워 둡니다."""
+    result = word.get("result", "-")
+    return {
+        "Word": {"title": [{"text": {"content": word["word"]}}]},
+        "Meaning": {"rich_text": [{"text": {"content": word["meaning"]}}]},
+        "결과": {"select": {"name": result} if result else None},
+        "페이지": {"relation": [{"id": page_id}]},
+    }
+
+
+def _word_rows_query(page_id: str, only_wrong: bool = False, words: list[str] | None = None) -> dict:
+    """목차 페이지에 연결된 단어 DB 행을 찾는 쿼리 인자"""
+    conditions = [{"property": "페이지", "relation": {"contains": page_id}}]
+    if only_wrong:
+        conditions.append({
+            "or": [
+                {"property": "결과", "select": {"equals": "❌"}},
+                {"property": "결과", "select": {"equals": "⏰"}},
+                {"property": "결과", "select": {"is_empty": True}},
+            ]
+        })
+    if words:
+        conditions.append({"or": [{"property": "Word", "title": {"equals": w}} for w in words]})
+
+    return {
+        "database_id": NOTION_WORDS_DATABASE_ID,
+        "filter": {"and": conditions},
+        "sorts": [{"timestamp": "created_time", "direction": "ascending"}],
+    }
+
+
+def _parse_word_row(row: dict) -> dict:
+    """단어 DB 행을 {"word", "meaning", "result"}로 변환합니다."""
+    props = row["properties"]
+    word_prop = props["Word"]["title"]
+    meaning_prop = props["Meaning"]["rich_text"]
+    result_prop = props["결과"]["select"]
+
+    return {
+        "word": word_prop[0]["plain_text"] if word_prop else "",
+        "meaning": meaning_prop[0]["plain_text"] if meaning_prop else "",
+        "result": result_prop["name"] if result_prop else "",
+    }
+
+
+def _query_all(client: Client, **query) -> list[dict]:
+    """페이지네이션을 따라가며 DB 쿼리 결과를 모두 가져옵니다."""
+    rows = []
+    cursor = None
+    while True:
+        results = client.databases.query(**query, **({"start_cursor": cursor} if cursor else {}))
+        rows.extend(results["results"])
+        if not results.get("has_more"):
+            return rows
+        cursor = results["next_cursor"]
+
+
+def _list_children(client: Client, block_id: str) -> dict:
+    """페이지네이션을 따라가며 블록의 자식을 모두 가져옵니다 ({"results": [...]} 형태)."""
+    children = []
+    cursor = None
+    while True:
+        results = client.blocks.children.list(block_id=block_id, **({"start_cursor": cursor} if cursor else {}))
+        children.extend(results["results"])
+        if not results.get("has_more"):
+            return {"results": children}
+        cursor = results["next_cursor"]
+
+
+def save_words(words: list[dict], summary: str, skip_known: bool = False) -> str:
+    """
+    Notion DB에 새 페이지를 생성하고, 페이지 내부에 3열 단어 테이블을 추가합니다.
+
+    Args:
+        words: [{"word": "...", "meaning": "..."}, ...]
+        summary: 페이지 요약
+        skip_known: True면 전역 단어 인덱스에 이미 있는 단어는 저장하지 않습니다.
+    """
+    if skip_known:
+        words, _ = word_index.split_known(words)
+        if not words:
+            raise ValueError("저장할 새 단어가 없습니다. 모든 단어가 이미 등록되어 있습니다.")
+
+    client = _get_client()
+    today = datetime.now().strftime("%Y-%m-%d")
+    seq = _get_next_seq(client)
+    page_title = f"{today}-{seq:02d}-{summary}"
+
+    new_page = client.pages.create(
+        parent={"database_id": NOTION_DATABASE_ID},
+        properties=_page_properties(page_title, summary),
+    )
+
+    page_id = new_page["id"]
+
+    if NOTION_STORAGE == "database":
+        for w in words:
+            client.pages.create(
+                parent={"database_id": NOTION_WORDS_DATABASE_ID},
+                properties=_word_row_properties(w, page_id),
+            )
+    else:
+        client.blocks.children.append(block_id=page_id, children=_word_table_blocks(words))
+    word_index.add_words(words, page_id, page_title)
     return page_title
 
 
 def fetch_pages() -> list[dict]:
-    """목차 DB에서 페이지 목록을 조회합니다."""
+    """목차 DB에서 페이지 목록을 조회합니다. 동시에 들어온 같은 요청은 하나로 합칩니다."""
+    return _single_flight(("pages",), _fetch_pages)
+
+
+def _fetch_pages() -> list[dict]:
     client = _get_client()
 
-    results = client.databases.query(
+    results = _query_all(
+        client,
         database_id=NOTION_DATABASE_ID,
         sorts=[{"property": "날짜+순번", "direction": "descending"}],
     )
 
-    pages = []
-    for page in results["results"]:
-        title_prop = page["properties"]["날짜+순번"]["title"]
-        summary_prop = page["properties"]["요약"]["rich_text"]
+    return [_parse_page(page) for page in results]
 
-        title = title_prop[0]["plain_text"] if title_prop else "(제목 없음)"
-        summary = summary_prop[0]["plain_text"] if summary_prop else ""
 
-        pages.append({"id": page["id"], "title": title, "summary": summary})
+def fetch_words(page_id: str, only_wrong: bool = False) -> list[dict]:
+    """
+    특정 페이지의 단어 목록을 조회합니다 (결과 컬럼 포함).
+    같은 페이지에 대한 동시 요청은 하나로 합칩니다.
 
-    return pages
+    Args:
+        page_id: Notion 페이지 ID
+        only_wrong: True면 결과가 ❌/⏰/없음인 단어만 반환합니다.
+                    "database" 저장 방식에서는 Notion 쿼리 필터로 처리됩니다.
+    """
+    return _single_flight(("words", page_id, only_wrong), _fetch_words, page_id, only_wrong)
 
 
-def fetch_words(page_id: str) -> list[dict]:
-    """특정 페이지의 테이블 블록에서 단어 목록을 추출합니다 (결과 컬럼 포함)."""
+def _fetch_words(page_id: str, only_wrong: bool) -> list[dict]:
+    if NOTION_STORAGE == "database":
+        client = _get_client()
+        rows = _query_all(client, **_word_rows_query(page_id, only_wrong=only_wrong))
+        return [w for w in map(_parse_word_row, rows) if w["word"] and w["meaning"]]
+
+    words = _fetch_table_words(page_id)
+    return [w for w in words if _is_wrong(w)] if only_wrong else words
+
+
+def _fetch_table_words(page_id: str) -> list[dict]:
+    """페이지의 테이블 블록에서 단어를 추출합니다."""
     client = _get_client()
 
-    blocks = client.blocks.children.list(block_id=page_id)
+    blocks = _list_children(client, page_id)
     words = []
 
     for block in blocks["results"]:
         if block["type"] == "table":
             table_width = block.get("table", {}).get("table_width", 2)
-            table_rows = client.blocks.children.list(block_id=block["id"])
-
-            for i, row in enumerate(table_rows["results"]):
-                if i == 0:
-                    continue
-
-                if row["type"] == "table_row":
-                    cells = row["table_row"]["cells"]
-                    if len(cells) >= 2:
-                        word_text = cells[0][0]["plain_text"] if cells[0] else ""
-                        meaning_text = cells[1][0]["plain_text"] if cells[1] else ""
-                        result_text = ""
-                        if table_width >= 3 and len(cells) >= 3 and cells[2]:
-                            result_text = cells[2][0]["plain_text"] if cells[2] else ""
-
-                        if word_text and meaning_text:
-                            words.append({
-                                "word": word_text,
-                                "meaning": meaning_text,
-                                "result": result_text,
-                            })
+            table_rows = _list_children(client, block["id"])
+            words.extend(_parse_table_rows(table_rows, table_width))
 
     return words
 
 
+def rebuild_word_index() -> int:
+    """모든 페이지의 단어 테이블을 읽어 전역 단어 인덱스를 다시 만듭니다."""
+    pages = [{**page, "words": fetch_words(page["id"])} for page in fetch_pages()]
+    return word_index.rebuild(pages)
+
+
 def update_word_results(page_id: str, results: list[dict]) -> None:
     """
     퀴즈 결과를 Notion 페이지의 단어 테이블에 업데이트합니다.
@@ -173,40 +438,73 @@ def update_word_results(page_id: str, results: list[dict]) -> None:
         results: [{"word": "apple", "result": "✅"}, ...]
     """
     client = _get_client()
-    result_map = {r["word"]: r["result"] for r in results}
 
-    blocks = client.blocks.children.list(block_id=page_id)
+    if NOTION_STORAGE == "database":
+        result_map = {r["word"]: r["result"] for r in results}
+        words = list(result_map)
+        for i in range(0, len(words), _WORDS_QUERY_CHUNK):
+            chunk = words[i:i + _WORDS_QUERY_CHUNK]
+            for row in _query_all(client, **_word_rows_query(page_id, words=chunk)):
+                word = _parse_word_row(row)["word"]
+                if word in result_map:
+                    client.pages.update(
+                        page_id=row["id"],
+                        properties={"결과": {"select": {"name": result_map[word]}}},
+                    )
+        return
+
+    blocks = _list_children(client, page_id)
 
     for block in blocks["results"]:
         if block["type"] == "table":
             table_width = block.get("table", {}).get("table_width", 2)
-            table_rows = client.blocks.children.list(block_id=block["id"])
-
-            for i, row in enumerate(table_rows["results"]):
-                if i == 0:
-                    continue
-
-                if row["type"] == "table_row":
-                    cells = row["table_row"]["cells"]
-                    word = cells[0][0]["plain_text"] if cells[0] else ""
-
-                    if word in result_map:
-                        emoji = result_map[word]
-                        if table_width >= 3:
-                            new_cells = [
-                                cells[0],
-                                cells[1],
-                                [{"type": "text", "text": {"content": emoji}}],
-                            ]
-                        else:
-                            meaning = cells[1][0]["plain_text"] if cells[1] else ""
-                            new_cells = [
-                                cells[0],
-                                [{"type": "text", "text": {"content": f"{meaning} {emoji}"}}],
-                            ]
+            table_rows = _list_children(client, block["id"])
 
-                        client.blocks.update(
-                            block_id=row["id"],
-                            table_row={"cells": new_cells},
-                        )
+            for row_id, new_cells in _result_row_updates(table_rows, table_width, results):
+                client.blocks.update(
+                    block_id=row_id,
+                    table_row={"cells": new_cells},
+                )
             break
+
+
+def migrate_tables_to_database() -> tuple[int, int]:
+    """
+    모든 페이지의 테이블 블록 단어를 단어 DB 행으로 옮깁니다.
+    이미 옮겨진 단어는 건너뛰므로 중간에 실패해도 다시 실행할 수 있습니다. 기존 테이블 블록은 삭제하지 않습니다.
+
+    Returns:
+        (단어를 옮긴 페이지 수, 새로 만든 행 수)
+    """
+    if not NOTION_WORDS_DATABASE_ID:
+        raise EnvironmentError("NOTION_WORDS_DATABASE_ID가 설정되지 않았습니다.")
+
+    client = _get_client()
+    migrated_pages = 0
+    created_rows = 0
+
+    for page in _fetch_pages():
+        existing = {
+            _parse_word_row(row)["word"]
+            for row in _query_all(client, **_word_rows_query(page["id"]))
+        }
+        new_words = [w for w in _fetch_table_words(page["id"]) if w["word"] not in existing]
+        for w in new_words:
+            client.pages.create(
+                parent={"database_id": NOTION_WORDS_DATABASE_ID},
+                properties=_word_row_properties(w, page["id"]),
+            )
+        if new_words:
+            migrated_pages += 1
+            created_rows += len(new_words)
+
+    return migrated_pages, created_rows
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["migrate"]:
+        print("사용법: python -m services.notion_service migrate")
+        sys.exit(1)
+
+    pages_count, rows_count = migrate_tables_to_database()
+    print(f"✅ {pages_count}개 페이지에서 {rows_count}개의 단어를 단어 DB로 옮겼습니다.")
@@ -0,0 +1,107 @@
+"""단어 목록 백그라운드 프리패치 서비스
+
+퀴즈 탭에서 페이지를 선택하는 즉시 해당 페이지(와 목록상 다음 몇 페이지)의
+단어 테이블을 미리 불러옵니다.
+
+- 선택한 페이지는 대기열을 거치지 않고 공용 Notion 이벤트 루프에 바로 요청합니다.
+- 다음 페이지(미리 보기)는 모든 세션이 공유하는 작업 스레드 풀로 보내며, 대기 중인 작업이
+  `PREFETCH_QUEUE_SIZE`개를 넘으면 건너뜁니다. 그래서 다른 세션의 미리 보기 때문에 선택한 페이지가 늦어지지 않습니다.
+- 세션마다 현재 선택/미리 보기 대상 페이지만 보관하고, 결과는 `PREFETCH_TTL_SECONDS`가 지나면 다시 불러옵니다.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import PREFETCH_QUEUE_SIZE, PREFETCH_TTL_SECONDS, PREFETCH_WORKERS
+from services import notion_async_service
+
+# 모든 세션이 공유하는 미리 보기 작업 스레드 풀과 대기열 크기 제한
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_lookahead_slots = threading.BoundedSemaphore(PREFETCH_QUEUE_SIZE)
+
+
+class WordPrefetcher:
+    """세션별 프리패치 상태. 같은 페이지는 한 번만 불러오고, 선택이 바뀌면 대상이 아닌 페이지를 버립니다."""
+
+    def __init__(self, fetch=None):
+        # fetch: page_id를 받아 단어 목록을 반환하는 코루틴 함수.
+        # 기본 함수는 생성 시점에 정해 테스트/부하 테스트의 스텁이 적용되도록 함
+        self._fetch = fetch if fetch is not None else notion_async_service.fetch_words
+        self._lock = threading.Lock()
+        # {page_id: (Future, 시작 시각, 미리 보기 작업 여부)}
+        self._entries: dict[str, tuple[Future, float, bool]] = {}
+
+    def _is_usable(self, page_id: str, retry_failed: bool) -> bool:
+        """
+        보관 중인 작업을 그대로 쓸 수 있는지 확인합니다.
+        실패한 작업은 retry_failed이거나 TTL이 지났을 때만 다시 시작해,
+        Notion 장애 중에 rerun마다 요청이 반복되지 않도록 합니다.
+        """
+        entry = self._entries.get(page_id)
+        if entry is None:
+            return False
+        future, started, _ = entry
+        if future.cancelled():
+            return False
+        if not future.done():
+            return True
+        if time.monotonic() - started > PREFETCH_TTL_SECONDS:
+            return False
+        return not (retry_failed and future.exception() is not None)
+
+    def _submit_selected(self, page_id: str) -> Future:
+        """선택한 페이지는 대기열을 거치지 않고 공용 이벤트 루프에 바로 요청합니다."""
+        future = notion_async_service.submit(self._fetch(page_id))
+        self._entries[page_id] = (future, time.monotonic(), False)
+        return future
+
+    def _submit_lookahead(self, page_id: str) -> None:
+        """다음 페이지는 공유 대기열이 가득 차 있지 않을 때만 미리 불러옵니다."""
+        if not _lookahead_slots.acquire(blocking=False):
+            return
+        future = _executor.submit(lambda: notion_async_service.run(self._fetch(page_id)))
+        future.add_done_callback(lambda _: _lookahead_slots.release())
+        self._entries[page_id] = (future, time.monotonic(), True)
+
+    def _ensure(self, page_id: str, selected: bool, retry_failed: bool = False) -> Future | None:
+        if self._is_usable(page_id, retry_failed):
+            future, _, lookahead = self._entries[page_id]
+            # 아직 시작하지 않은 미리 보기 작업이 선택되면 대기열에서 빼고 바로 요청
+            if not (selected and lookahead and future.cancel()):
+                return future
+        if selected:
+            return self._submit_selected(page_id)
+        self._submit_lookahead(page_id)
+        return None
+
+    def request(self, page_ids: list[str]) -> None:
+        """
+        주어진 페이지들을 미리 불러옵니다. 첫 번째가 선택한 페이지, 나머지는 다음 페이지입니다.
+
+        목록에 없는 페이지는 보관하지 않고 (시작 전이면 취소),
+        이미 불러왔거나 진행 중인 페이지, 실패한 페이지는 TTL 안에서는 다시 요청하지 않습니다.
+        """
+        wanted = dict.fromkeys(page_ids)
+        with self._lock:
+            for page_id, (future, _, _) in list(self._entries.items()):
+                if page_id not in wanted:
+                    future.cancel()
+                    del self._entries[page_id]
+            for i, page_id in enumerate(wanted):
+                self._ensure(page_id, selected=i == 0)
+
+    def get(self, page_id: str) -> list[dict]:
+        """
+        페이지의 단어 목록을 반환합니다. 프리패치가 진행 중이면 완료될 때까지 기다리고,
+        이전 프리패치가 실패했다면 다시 불러옵니다.
+        """
+        with self._lock:
+            future = self._ensure(page_id, selected=True, retry_failed=True)
+        return notion_async_service.result(future)
+
+    def invalidate(self, page_id: str) -> None:
+        """퀴즈 결과가 반영되는 등 내용이 바뀐 페이지의 캐시를 버립니다."""
+        with self._lock:
+            entry = self._entries.pop(page_id, None)
+            if entry is not None:
+                entry[0].cancel()
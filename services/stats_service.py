@@ -0,0 +1,140 @@
+"""단어별 학습 통계 서비스
+
+퀴즈 응답을 (word, page, quiz_type, result, latency_ms, timestamp) 이벤트로
+로컬 JSONL 파일에 추가만 하고, 단어별 집계(시도 수, 정답률, 응답 시간 중앙값)는
+메모리에서 이벤트마다 O(1)로 갱신합니다. 파일 전체는 프로세스 시작 후 최초 1회만 읽습니다.
+"""
+import json
+import threading
+import time
+
+from config import STATS_PATH
+
+# 응답 시간 히스토그램: 250ms 단위, 30초 이상은 마지막 칸
+LATENCY_BUCKET_MS = 250
+LATENCY_BUCKETS = 121
+
+_lock = threading.Lock()
+# {page_id: {word: WordStats}}
+_stats: dict[str, dict[str, "WordStats"]] | None = None
+
+
+class WordStats:
+    """단어 하나의 누적 통계"""
+
+    __slots__ = ("attempts", "correct", "timeouts", "_latency_hist")
+
+    def __init__(self):
+        self.attempts = 0
+        self.correct = 0
+        self.timeouts = 0
+        self._latency_hist = [0] * LATENCY_BUCKETS
+
+    def add(self, result: str, latency_ms: int) -> None:
+        self.attempts += 1
+        if result == "✅":
+            self.correct += 1
+        elif result == "⏰":
+            self.timeouts += 1
+        bucket = min(max(latency_ms, 0) // LATENCY_BUCKET_MS, LATENCY_BUCKETS - 1)
+        self._latency_hist[bucket] += 1
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.attempts if self.attempts else 0.0
+
+    @property
+    def median_latency_ms(self) -> int:
+        """히스토그램 기반 중앙값 (구간 중앙값, 오차 ±125ms)"""
+        half = (self.attempts + 1) // 2
+        seen = 0
+        for bucket, count in enumerate(self._latency_hist):
+            seen += count
+            if seen >= half:
+                return bucket * LATENCY_BUCKET_MS + LATENCY_BUCKET_MS // 2
+        return 0
+
+    def to_dict(self) -> dict:
+        return {
+            "attempts": self.attempts,
+            "correct": self.correct,
+            "timeouts": self.timeouts,
+            "accuracy": self.accuracy,
+            "median_latency_ms": self.median_latency_ms,
+        }
+
+
+def _apply(stats: dict, event: dict) -> None:
+    page_stats = stats.setdefault(event["page_id"], {})
+    if event["word"] not in page_stats:
+        page_stats[event["word"]] = WordStats()
+    page_stats[event["word"]].add(event["result"], event["latency_ms"])
+
+
+def _load() -> dict[str, dict[str, WordStats]]:
+    """이벤트 파일을 재생해 집계를 만듭니다 (최초 1회)."""
+    global _stats
+    if _stats is None:
+        stats = {}
+        try:
+            with open(STATS_PATH, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        _apply(stats, json.loads(line))
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+        except FileNotFoundError:
+            pass
+        _stats = stats
+    return _stats
+
+
+def record(page_id: str, quiz_type: str, answers: list[dict]) -> None:
+    """
+    퀴즈 응답들을 이벤트로 저장하고 집계를 갱신합니다.
+
+    Args:
+        page_id: Notion 페이지 ID
+        quiz_type: "A" 또는 "B"
+        answers: [{"word": "apple", "result": "✅", "latency_ms": 1830}, ...]
+    """
+    now = time.time()
+    events = [
+        {
+            "word": a["word"],
+            "page_id": page_id,
+            "quiz_type": quiz_type,
+            "result": a["result"],
+            "latency_ms": int(a["latency_ms"]),
+            "ts": now,
+        }
+        for a in answers
+    ]
+
+    with _lock:
+        stats = _load()
+        with open(STATS_PATH, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        for event in events:
+            _apply(stats, event)
+
+
+def word_stats(page_id: str) -> dict[str, dict]:
+    """페이지의 단어별 통계 {"apple": {"attempts", "correct", "timeouts", "accuracy", "median_latency_ms"}}"""
+    with _lock:
+        return {word: s.to_dict() for word, s in _load().get(page_id, {}).items()}
+
+
+def weak_words(page_id: str, words: list[dict], limit: int = 10) -> list[dict]:
+    """
+    응시 기록이 있는 단어 중 정답률이 낮고 응답이 느린 순으로 최대 limit개를 고릅니다.
+
+    Args:
+        words: 페이지의 단어 목록 (fetch_words 결과)
+    """
+    with _lock:
+        page_stats = _load().get(page_id, {})
+        attempted = [(page_stats[w["word"]], w) for w in words if w["word"] in page_stats]
+    attempted.sort(key=lambda sw: (sw[0].accuracy, -sw[0].median_latency_ms))
+    return [w for s, w in attempted[:limit] if s.accuracy < 1.0 or s.median_latency_ms >= 10_000]
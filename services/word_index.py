@@ -0,0 +1,106 @@
+"""전역 단어 인덱스 서비스
+
+이미 Notion에 저장된 단어를 로컬 JSON 파일에 색인해 두고,
+새로 추출한 단어가 중복인지 단어당 O(1)로 확인합니다.
+"""
+import json
+import os
+import threading
+
+from config import WORD_INDEX_PATH
+
+_lock = threading.Lock()
+_index: dict[str, dict] | None = None
+
+
+def _normalize(word: str) -> str:
+    """대소문자/앞뒤 공백 차이를 무시하는 인덱스 키"""
+    return " ".join(word.strip().lower().split())
+
+
+def _load() -> dict[str, dict]:
+    """인덱스 파일을 읽어 메모리에 올립니다 (최초 1회)."""
+    global _index
+    if _index is None:
+        try:
+            with open(WORD_INDEX_PATH, encoding="utf-8") as f:
+                _index = json.load(f).get("words", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            _index = {}
+    return _index
+
+
+def _save(index: dict[str, dict]) -> None:
+    """인덱스를 임시 파일에 쓴 뒤 원자적으로 교체합니다."""
+    tmp_path = f"{WORD_INDEX_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "words": index}, f, ensure_ascii=False)
+    os.replace(tmp_path, WORD_INDEX_PATH)
+
+
+def lookup(word: str) -> dict | None:
+    """
+    단어가 이미 저장되어 있으면 원본 페이지 정보를 반환합니다.
+
+    Returns:
+        {"page_id": "...", "title": "..."} 또는 None
+    """
+    with _lock:
+        return _load().get(_normalize(word))
+
+
+def annotate(words: list[dict]) -> list[dict]:
+    """
+    추출된 단어 목록에 중복 여부를 표시합니다.
+
+    Returns:
+        각 단어에 "known_in" (원본 페이지 제목 또는 "") 키를 추가한 새 리스트
+    """
+    with _lock:
+        index = _load()
+        return [
+            {**w, "known_in": index.get(_normalize(w["word"]), {}).get("title", "")}
+            for w in words
+        ]
+
+
+def split_known(words: list[dict]) -> tuple[list[dict], list[dict]]:
+    """단어 목록을 (새 단어, 이미 저장된 단어)로 나눕니다."""
+    with _lock:
+        index = _load()
+        new_words, known_words = [], []
+        for w in words:
+            (known_words if _normalize(w["word"]) in index else new_words).append(w)
+        return new_words, known_words
+
+
+def add_words(words: list[dict], page_id: str, title: str) -> None:
+    """새로 저장된 단어들을 인덱스에 등록합니다. 기존 항목은 덮어쓰지 않습니다."""
+    with _lock:
+        index = _load()
+        for w in words:
+            index.setdefault(_normalize(w["word"]), {"page_id": page_id, "title": title})
+        _save(index)
+
+
+def rebuild(pages: list[dict]) -> int:
+    """
+    Notion 전체 페이지로부터 인덱스를 다시 만듭니다.
+
+    Args:
+        pages: [{"id": "...", "title": "...", "words": [{"word": ...}, ...]}, ...]
+               오래된 페이지가 원본으로 남도록 생성 순서와 무관하게 제목 오름차순으로 처리합니다.
+
+    Returns:
+        색인된 단어 수
+    """
+    global _index
+    index: dict[str, dict] = {}
+    for page in sorted(pages, key=lambda p: p["title"]):
+        for w in page["words"]:
+            index.setdefault(_normalize(w["word"]), {"page_id": page["id"], "title": page["title"]})
+
+    with _lock:
+        _index = index
+        _save(index)
+    return len(index)
@@ -0,0 +1,114 @@
+"""gemini_scheduler: 예산이 가득 찬 상태에서도 헤지/대체 모델 요청이 진행되는지 확인합니다."""
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import config
+from services import gemini_scheduler
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch):
+    """환경 변수로 설정을 바꾼 뒤 config와 스케줄러를 다시 불러옵니다."""
+    release = threading.Event()
+
+    def _make(**env):
+        defaults = {
+            "GEMINI_MODEL": "main",
+            "GEMINI_FALLBACK_MODELS": "fast",
+            "GEMINI_MAX_CONCURRENCY": "4",
+            "GEMINI_MAX_RETRIES": "0",
+            "GEMINI_HEDGE_AFTER_SECONDS": "0",
+            "GEMINI_SLO_SECONDS": "0.5",
+        }
+        for name, value in {**defaults, **env}.items():
+            monkeypatch.setenv(name, value)
+        importlib.reload(config)
+        return importlib.reload(gemini_scheduler), release
+
+    yield _make
+    # 느린 요청을 풀고 작업 스레드가 모두 끝난 뒤 원래 환경 변수로 모듈을 되돌림
+    # (스레드가 남아 있으면 reload로 바뀐 전역 상태를 보게 됨)
+    release.set()
+    for executor in [*gemini_scheduler._model_executors.values(), *gemini_scheduler._request_executors.values()]:
+        executor.shutdown(wait=True)
+    monkeypatch.undo()
+    importlib.reload(config)
+    importlib.reload(gemini_scheduler)
+
+
+class _ModelStub:
+    """"main"은 release될 때까지 멈추고, 나머지 모델은 0.1초 만에 응답합니다. 동시 요청 수 최댓값을 기록합니다."""
+
+    def __init__(self, release: threading.Event):
+        self._release = release
+        self._lock = threading.Lock()
+        self._running = 0
+        self.max_running = 0
+
+    def __call__(self, model_name: str) -> str:
+        with self._lock:
+            self._running += 1
+            self.max_running = max(self.max_running, self._running)
+        try:
+            if model_name == "main":
+                self._release.wait(10)
+            else:
+                time.sleep(0.1)
+            return model_name
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+def _timed_calls(scheduler, fn, count: int) -> list[tuple[str, float]]:
+    def one(_):
+        started = time.monotonic()
+        return scheduler.call("test", fn), time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(one, range(count)))
+
+
+def test_slo_miss_under_full_budget_is_served_by_fallback(make_scheduler):
+    scheduler, release = make_scheduler()
+    model = _ModelStub(release)
+
+    results = _timed_calls(scheduler, model, 4)
+
+    assert [model for model, _ in results] == ["fast"] * 4
+    assert max(elapsed for _, elapsed in results) < 2.0
+    assert model.max_running <= 4
+    assert all(entry["fallback"] and entry["slo_missed"] == ["main"] for entry in scheduler.get_serving_log())
+
+
+def test_fallback_is_not_blocked_by_hedge_requests(make_scheduler):
+    scheduler, release = make_scheduler(GEMINI_MAX_CONCURRENCY="2", GEMINI_HEDGE_AFTER_SECONDS="0.1")
+    model = _ModelStub(release)
+
+    results = _timed_calls(scheduler, model, 2)
+
+    assert [model for model, _ in results] == ["fast"] * 2
+    assert max(elapsed for _, elapsed in results) < 2.0
+    assert model.max_running <= 2
+    # 예약분을 뺀 예산이 가득 차 있으므로 헤지하지 않음
+    assert not any(entry["hedged"] for entry in scheduler.get_serving_log())
+
+
+def test_hedges_when_budget_has_room(make_scheduler):
+    scheduler, release = make_scheduler(GEMINI_FALLBACK_MODELS="", GEMINI_HEDGE_AFTER_SECONDS="0.1")
+    calls = []
+
+    def fn(model_name: str) -> str:
+        calls.append(model_name)
+        if len(calls) == 1:
+            release.wait(10)
+            return "slow"
+        return "hedge"
+
+    assert scheduler.call("test", fn) == "hedge"
+    assert scheduler.get_serving_log()[0]["hedged"]
+